@@ -348,179 +348,6 @@ class FixedTradingBot:
                     pass
             logger.error(f"Error closing trade {trade.id}: {e}")
     
-    def _check_for_new_trade(self, df, symbol, current_price):
-        """Check if we should open a new trade"""
-        logger.info(f"Checking for new trade opportunities for {symbol} at price {current_price}")
-        
-        # Get trading signal from SimpleTradingLogic (same as dashboard)
-        last_row = df.iloc[-1].to_dict()
-        should_trade, trade_type, reason, confidence = self.trading_logic.should_trade(last_row)
-
-        logger.info(f"Trading signal: should_trade={should_trade}, type={trade_type}, reason='{reason}', confidence={confidence:.4f}")
-        
-        # Evaluate market conditions
-        last_row = df.iloc[-1].to_dict()
-        market_eval = self.risk_manager.evaluate_market_conditions(last_row)
-        
-        logger.info(f"Market evaluation: trend={market_eval['market_trend']}, risk_score={market_eval['risk_score']}")
-        
-        # Check available balances to determine possible trade types
-        balance_response = self.api.get_account_balance()
-        available_jpy = 0
-        available_doge = 0
-
-        if 'data' in balance_response:
-            for asset in balance_response['data']:
-                if asset['symbol'] == 'JPY':
-                    available_jpy = float(asset['available'])
-                elif asset['symbol'] == 'DOGE':
-                    available_doge = float(asset['available'])
-
-        logger.info(f"Available balances - JPY: {available_jpy}, DOGE: {available_doge}")
-
-        # Use SimpleTradingLogic result and check balance constraints
-        final_should_trade = False
-        final_trade_type = None
-        final_trade_reason = ""
-
-        if should_trade and trade_type:
-            if trade_type.upper() == 'BUY':
-                if available_jpy > 100:  # Minimum JPY required for trade
-                    if market_eval['market_trend'] != 'bearish' or market_eval['trend_strength'] < 0.7:
-                        final_should_trade = True
-                        final_trade_type = 'buy'
-                        final_trade_reason = f"{reason} - Buying DOGE with JPY (confidence: {confidence:.2f})"
-                else:
-                    logger.info(f"Buy signal detected but insufficient JPY balance ({available_jpy})")
-            elif trade_type.upper() == 'SELL':
-                if available_doge >= 10:  # Minimum DOGE required for SELL order
-                    if market_eval['market_trend'] != 'bullish' or market_eval['trend_strength'] < 0.7:
-                        final_should_trade = True
-                        final_trade_type = 'sell'
-                        final_trade_reason = f"{reason} - Selling DOGE for JPY (confidence: {confidence:.2f})"
-                else:
-                    logger.info(f"Sell signal detected but insufficient DOGE balance ({available_doge})")
-        elif market_eval['trend_strength'] > 0.5:  # 閾値を下げて取引機会を増加
-            # Strong trend without clear SimpleTradingLogic signal
-            if market_eval['market_trend'] == 'bullish' and available_jpy > 100:
-                final_should_trade = True
-                final_trade_type = 'buy'
-                final_trade_reason = f"Strong bullish trend detected. Strength: {market_eval['trend_strength']:.2f} - Buying DOGE"
-            elif market_eval['market_trend'] == 'bearish' and available_doge >= 10:
-                final_should_trade = True
-                final_trade_type = 'sell'
-                final_trade_reason = f"Strong bearish trend detected. Strength: {market_eval['trend_strength']:.2f} - Selling DOGE"
-
-        # 【重要】逆シグナル検出による一括決済チェック
-        self._check_opposite_signal_closure(symbol, current_price, should_trade, trade_type, reason)
-
-        if final_should_trade and final_trade_type:
-            logger.info(f"Decision to trade: {final_trade_type} because {final_trade_reason}")
-            self._execute_trade(symbol, final_trade_type, current_price, last_row)
-        else:
-            logger.info("No trade opportunity at this time")
-
-    def _execute_trade(self, symbol, trade_type, current_price, indicators_data):
-        """Execute a new trade"""
-        logger.info(f"Executing {trade_type} trade for {symbol} at {current_price}")
-        
-        try:
-            # Get available balance
-            balance_response = self.api.get_account_balance()
-
-            available_jpy = 0
-            available_doge = 0
-            if 'data' in balance_response:
-                for asset in balance_response['data']:
-                    if asset['symbol'] == 'JPY':
-                        available_jpy = float(asset['available'])
-                    elif asset['symbol'] == 'DOGE':
-                        available_doge = float(asset['available'])
-
-                logger.info(f"Available balance for trading - JPY: {available_jpy}, DOGE: {available_doge}")
-
-            # Calculate optimal position size using enhanced risk management
-            confidence = indicators_data.get('signal_confidence', 0.8)  # Default confidence
-            position_size = self.risk_manager.calculate_position_size(
-                available_balance=available_jpy,
-                current_price=current_price,
-                symbol=symbol,
-                market_indicators=indicators_data,
-                confidence=confidence
-            )
-
-            if trade_type.lower() == 'buy':
-                if available_jpy <= 100:
-                    logger.error("Insufficient JPY balance for BUY trade")
-                    return
-                logger.info(f"Enhanced BUY order: {position_size:.2f} DOGE (optimized for market conditions)")
-            else:  # SELL trade
-                if available_jpy <= 100:  # For leverage SELL, need JPY as margin
-                    logger.error("Insufficient JPY balance for leverage SELL trade")
-                    return
-                logger.info(f"Enhanced SELL order: {position_size:.2f} DOGE (optimized for market conditions)")
-
-            logger.info(f"Calculated position size for {symbol}: {position_size}")
-
-            # Format size according to currency pair requirements
-            if 'DOGE_' in symbol:
-                position_size_rounded = max(10, int(position_size))  # 最低10DOGE、ただし計算値を優先
-                position_size_str = f"{position_size_rounded}"
-            elif 'XRP_' in symbol:
-                position_size_rounded = max(10, int(position_size))
-                position_size_str = f"{position_size_rounded}"
-            elif 'BTC_' in symbol:
-                position_size_rounded = max(0.0001, round(position_size, 8))
-                position_size_str = f"{position_size_rounded:.8f}"
-            elif 'ETH_' in symbol:
-                position_size_rounded = max(0.001, round(position_size, 8))
-                position_size_str = f"{position_size_rounded:.8f}"
-            else:
-                position_size_rounded = max(1, round(position_size, 4))
-                position_size_str = f"{position_size_rounded:.4f}"
-            
-            # Execute the order
-            result = self.api.place_order(
-                symbol=symbol,
-                side=trade_type.upper(),
-                execution_type="MARKET",
-                size=position_size_str
-            )
-            
-            if 'data' in result:
-                # Create new trade record
-                from models import Trade
-                new_trade = Trade()
-                new_trade.user_id = self.user.id
-                new_trade.currency_pair = symbol
-                new_trade.trade_type = trade_type.lower()
-                new_trade.amount = position_size_rounded
-                new_trade.price = current_price
-                new_trade.status = 'open'
-                new_trade.indicators_data = indicators_data
-
-                # Initialize trailing stop price attribute if enabled
-                if self.risk_manager.trailing_stop_enabled:
-                    new_trade.trailing_stop_price = None
-                
-                if self.db_session and self.app:
-                    with self.app.app_context():
-                        self.db_session.add(new_trade)
-                        self.db_session.commit()
-                
-                logger.info(f"New {trade_type} trade executed: {position_size_rounded} {symbol} at {current_price}")
-            else:
-                logger.error(f"Failed to execute {trade_type} trade. API response: {result}")
-                
-        except Exception as e:
-            logger.error(f"Error executing {trade_type} trade: {e}")
-            if self.db_session and self.app:
-                try:
-                    with self.app.app_context():
-                        self.db_session.rollback()
-                except:
-                    pass
-    
     def _check_major_trend_reversal(self, active_trades, market_indicators):
         """Check for major trend reversal that requires closing all positions"""
         if not market_indicators or not active_trades:
@@ -13,10 +13,13 @@ Strategy:
 Position state file: position_history.json (tracks last close per side, for 24h block).
 """
 
+import atexit
 import json
 import logging
 import os
+import queue
 import sys
+import threading
 import time
 from datetime import datetime, timezone, timedelta
 
@@ -43,6 +46,11 @@ class OptimizedLeverageTradingBot:
     MIN_SIZE = 10
     TAKE_PROFIT_RATIO = 0.02   # +2%
     STOP_LOSS_RATIO = 0.01     # -1%
+    # Exit price multipliers of the entry price (BUY: up=TP / down=SL, SELL: the reverse)
+    _TP_UP = 1 + TAKE_PROFIT_RATIO
+    _TP_DN = 1 - TAKE_PROFIT_RATIO
+    _SL_UP = 1 + STOP_LOSS_RATIO
+    _SL_DN = 1 - STOP_LOSS_RATIO
     REENTRY_BLOCK_SECONDS = 24 * 3600
     HISTORY_FILE = 'position_history.json'
     LOG_FILE = 'bot_execution_log.txt'
@@ -59,6 +67,15 @@ class OptimizedLeverageTradingBot:
         self.logic = OptimizedTradingLogic()
 
         self.history = self._load_history()
+        # per-side reentry deadlines on the monotonic clock (history keeps wall-clock ISO times)
+        self._block_until = {side: self._to_monotonic_deadline(iso)
+                             for side, iso in self.history['last_close'].items()}
+
+        # execution log lines are written by a background thread holding one open handle
+        self._log_q = queue.SimpleQueue()
+        self._log_thread = threading.Thread(target=self._log_writer, name='exec-log-writer', daemon=True)
+        self._log_thread.start()
+        atexit.register(self._stop_log_writer)
 
     def _load_history(self):
         if not os.path.exists(self.HISTORY_FILE):
@@ -81,31 +98,66 @@ class OptimizedLeverageTradingBot:
 
     def _record_close(self, side):
         self.history['last_close'][side] = datetime.now(timezone.utc).isoformat()
+        self._block_until[side] = time.monotonic() + self.REENTRY_BLOCK_SECONDS
         self._save_history()
 
-    def _log_event(self, text):
-        """Append a line to bot_execution_log.txt (read by /logs endpoint)."""
+    def _to_monotonic_deadline(self, last_iso):
+        """Map a persisted close time onto the monotonic clock as the end of its reentry block."""
         try:
-            if os.path.exists(self.LOG_FILE) and os.path.getsize(self.LOG_FILE) > self.LOG_MAX_BYTES:
-                with open(self.LOG_FILE, 'r') as f:
-                    data = f.read()
-                with open(self.LOG_FILE, 'w') as f:
-                    f.write(data[-self.LOG_MAX_BYTES // 2:])
-            with open(self.LOG_FILE, 'a') as f:
+            last = datetime.fromisoformat(last_iso)
+            elapsed = (datetime.now(timezone.utc) - last).total_seconds()
+        except (TypeError, ValueError):
+            return float('-inf')
+        return time.monotonic() - elapsed + self.REENTRY_BLOCK_SECONDS
+
+    def _log_event(self, text):
+        """Queue a line for bot_execution_log.txt (read by /logs endpoint)."""
+        self._log_q.put(text)
+
+    def _log_writer(self):
+        """Drain the log queue into a long-lived handle, flushing whenever the queue empties."""
+        f = None
+        while True:
+            text = self._log_q.get()
+            if text is None:  # shutdown sentinel from _stop_log_writer
+                if f is not None:
+                    f.close()
+                return
+            try:
+                if f is None:
+                    self._truncate_log()
+                    f = open(self.LOG_FILE, 'a', encoding='utf-8')
                 f.write(text + '\n')
-        except IOError:
-            pass
+                if self._log_q.empty():
+                    f.flush()
+                    if f.tell() > self.LOG_MAX_BYTES:
+                        f.close()
+                        f = None
+            except Exception as e:
+                # Never let one bad line kill the writer: drop it, reopen on the next line
+                logger.warning(f"Execution log write failed: {e}")
+                if f is not None:
+                    try:
+                        f.close()
+                    except Exception:
+                        pass
+                    f = None
+
+    def _stop_log_writer(self):
+        """Write out lines still queued at interpreter exit (the writer is a daemon thread)."""
+        self._log_q.put(None)
+        self._log_thread.join(timeout=5)
+
+    def _truncate_log(self):
+        """Keep the last half of the log once it exceeds LOG_MAX_BYTES."""
+        if os.path.exists(self.LOG_FILE) and os.path.getsize(self.LOG_FILE) > self.LOG_MAX_BYTES:
+            with open(self.LOG_FILE, 'r', encoding='utf-8', errors='replace') as f:
+                data = f.read()
+            with open(self.LOG_FILE, 'w', encoding='utf-8') as f:
+                f.write(data[-self.LOG_MAX_BYTES // 2:])
 
     def _is_blocked(self, side):
-        last_iso = self.history['last_close'].get(side)
-        if not last_iso:
-            return False
-        try:
-            last = datetime.fromisoformat(last_iso)
-        except ValueError:
-            return False
-        elapsed = (datetime.now(timezone.utc) - last).total_seconds()
-        return elapsed < self.REENTRY_BLOCK_SECONDS
+        return time.monotonic() < self._block_until.get(side, float('-inf'))
 
     def _get_jpy_balance(self):
         resp = self.api.get_account_balance()
@@ -150,15 +202,18 @@ class OptimizedLeverageTradingBot:
         if entry <= 0:
             return None
         if side == 'BUY':
-            pnl_ratio = (current_price - entry) / entry
+            hit_tp = current_price >= entry * self._TP_UP
+            hit_sl = current_price <= entry * self._SL_DN
         else:
-            pnl_ratio = (entry - current_price) / entry
+            hit_tp = current_price <= entry * self._TP_DN
+            hit_sl = current_price >= entry * self._SL_UP
+        if not (hit_tp or hit_sl):
+            return None
 
-        if pnl_ratio >= self.TAKE_PROFIT_RATIO:
+        pnl_ratio = ((current_price - entry) / entry) if side == 'BUY' else ((entry - current_price) / entry)
+        if hit_tp:
             return f"TP +{pnl_ratio*100:.2f}%"
-        if pnl_ratio <= -self.STOP_LOSS_RATIO:
-            return f"SL {pnl_ratio*100:.2f}%"
-        return None
+        return f"SL {pnl_ratio*100:.2f}%"
 
     def _close_position(self, position, current_price, reason):
         pid = position.get('positionId')
@@ -277,7 +332,8 @@ class OptimizedLeverageTradingBot:
                 self._log_event(f"DECISION: HOLD (P/L {pnl_ratio*100:+.2f}% within bounds)")
             return
 
-        signal = self.logic.should_trade(df.iloc[-1].to_dict(), df)
+        # reuse the snapshot's ADX instead of recomputing it over the same frame
+        signal = self.logic.should_trade(df.iloc[-1].to_dict(), df, adx=snap['adx'])
         should_trade, trade_type, reason, confidence, _, _ = signal
         logger.info(f"📈 Signal: should={should_trade} type={trade_type} conf={confidence:.2f} reason={reason}")
         self._log_event(f"SIGNAL: should_trade={should_trade} type={trade_type} conf={confidence:.2f} reason={reason}")
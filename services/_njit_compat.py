@@ -0,0 +1,23 @@
+"""
+Shared numba import for the services/_*_njit kernel modules
+Numbaカーネル共通のインポート（未導入時のフォールバック付き）
+
+Exports njit, prange and NUMBA_AVAILABLE. Without numba, njit is a no-op
+decorator and prange is range, so the kernels run as plain Python.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -0,0 +1,131 @@
+"""
+Numba kernel for the rolling parameter optimizer's trade simulation
+ローリング最適化の取引シミュレーション用Numbaカーネル
+
+The per-bar position state machine (hard SL, trailing stop, MACD-cross
+exit and entry) is compiled with cache=True and warmed up on import.
+Falls back to plain Python when numba is not installed.
+"""
+
+import logging
+
+import numpy as np
+
+from services._njit_compat import NUMBA_AVAILABLE, njit
+
+logger = logging.getLogger(__name__)
+
+POSITION_SIZE = 50  # 固定サイズ（手数料比較のため統一）
+
+
+@njit(cache=True)
+def simulate_macd_trades(closes, highs, lows, cross, confirmed_hists, start_idx,
+                         stop_loss_pct, entry_hist_filter, close_hist_filter,
+                         trailing_thresholds, trailing_locks, fee_per_trade):
+    """
+    Simulate MACD-cross entries/exits with hard SL and a stepped trailing stop
+
+    Args:
+        closes, highs, lows: per-bar prices
+        cross: per-bar confirmed MACD cross (+2 golden, -2 death, 0 none)
+        confirmed_hists: per-bar |MACD - signal| of the confirmed bar
+        start_idx: first simulated bar
+        trailing_thresholds, trailing_locks: trailing steps (peak P/L -> locked SL)
+
+    Returns:
+        Tuple of (total_trades, gross_pnl, total_fees, wins, win_pnl, loss_pnl)
+    """
+    n_trades = 0
+    gross_pnl = 0.0
+    total_fees = 0.0
+    wins = 0
+    win_pnl = 0.0
+    loss_pnl = 0.0
+
+    side = 0  # 1: BUY, -1: SELL, 0: no position
+    entry = 0.0
+    peak_pl = 0.0
+
+    for i in range(start_idx, len(closes)):
+        price = closes[i]
+        is_golden = cross[i] == 2
+        is_death = cross[i] == -2
+        confirmed_hist = confirmed_hists[i]
+
+        # === ポジション保有中: 決済判定 ===
+        if side != 0:
+            pnl = 0.0
+            closed = False
+            if side == 1:
+                pl_ratio = (price - entry) / entry
+                # ローソク足内の最安値でSLチェック
+                worst_pl = (lows[i] - entry) / entry
+            else:
+                pl_ratio = (entry - price) / entry
+                worst_pl = (entry - highs[i]) / entry
+
+            # トレーリングストップ更新
+            if pl_ratio > peak_pl:
+                peak_pl = pl_ratio
+
+            current_sl = -stop_loss_pct  # デフォルトはハードSL
+            for k in range(len(trailing_thresholds)):
+                if peak_pl >= trailing_thresholds[k]:
+                    current_sl = trailing_locks[k]
+
+            # SLチェック（ローソク足内の最悪値で判定、SLレベルで決済）
+            stopped = worst_pl <= current_sl
+            if stopped:
+                if side == 1:
+                    pnl = (entry * (1 + current_sl) - entry) * POSITION_SIZE
+                else:
+                    pnl = (entry - entry * (1 - current_sl)) * POSITION_SIZE
+                closed = True
+            # MACDクロス決済（決済後は反対エントリー判定へ）
+            elif side == 1 and is_death and confirmed_hist > close_hist_filter:
+                pnl = (price - entry) * POSITION_SIZE
+                closed = True
+            elif side == -1 and is_golden and confirmed_hist > close_hist_filter:
+                pnl = (entry - price) * POSITION_SIZE
+                closed = True
+
+            if closed:
+                n_trades += 1
+                gross_pnl += pnl
+                total_fees += fee_per_trade * 2  # エントリー+決済
+                if pnl > 0:
+                    wins += 1
+                    win_pnl += pnl
+                else:
+                    loss_pnl += pnl
+                side = 0
+                if stopped:
+                    continue
+
+        # === ポジションなし: エントリー判定 ===
+        if side == 0:
+            if is_golden and confirmed_hist > entry_hist_filter:
+                side = 1
+                entry = price
+                peak_pl = 0.0
+            elif is_death and confirmed_hist > entry_hist_filter:
+                side = -1
+                entry = price
+                peak_pl = 0.0
+
+    return n_trades, gross_pnl, total_fees, wins, win_pnl, loss_pnl
+
+
+def warmup():
+    """Compile (or load from the on-disk cache) the kernel with the signature used at runtime"""
+    prices = np.linspace(1.0, 2.0, 8)
+    steps = np.array([0.005, 0.01])
+    simulate_macd_trades(prices, prices, prices, np.zeros(8, np.int64), prices, 1,
+                         0.01, 0.001, 0.001, steps, steps, 1.0)
+
+
+if NUMBA_AVAILABLE:
+    try:
+        warmup()
+    except Exception as e:
+        logger.warning(f"Rolling optimizer kernel warmup failed: {str(e)}")
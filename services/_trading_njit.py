@@ -0,0 +1,106 @@
+"""
+Numba kernels for the live trading decision path
+ライブ取引判定用のNumbaカーネル
+
+Kernels are JIT-compiled with cache=True and warmed up at import; falls
+back to plain Python when numba is not installed.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+from services._njit_compat import NUMBA_AVAILABLE, njit
+
+logger = logging.getLogger(__name__)
+
+# decide() status codes
+SIGNAL_SELL = -1
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_WEAK_TREND = 2
+SIGNAL_NAN = 3
+
+
+@njit(cache=True)
+def decide(adx, ema20, ema50, macd_hist, adx_threshold):
+    """
+    v4 trend-following decision on the confirmed bar
+
+    Returns:
+        Tuple of (status, confidence); status is one of the SIGNAL_* codes
+    """
+    if math.isnan(adx) or math.isnan(ema20) or math.isnan(ema50) or math.isnan(macd_hist):
+        return SIGNAL_NAN, 0.0
+
+    if adx < adx_threshold:
+        return SIGNAL_WEAK_TREND, 0.0
+
+    if ema20 > ema50 and macd_hist > 0:
+        return SIGNAL_BUY, min(adx / 50.0, 1.0)
+
+    if ema20 < ema50 and macd_hist < 0:
+        return SIGNAL_SELL, min(adx / 50.0, 1.0)
+
+    return SIGNAL_NONE, 0.0
+
+
+@njit(cache=True)
+def decide_batch(adx, ema20, ema50, macd_hist, adx_threshold):
+    """
+    decide over every bar in one compiled loop (backtest batch mode)
+
+    Returns:
+        Tuple of (status, confidence) arrays, one entry per bar
+    """
+    n = len(adx)
+    status = np.empty(n, np.int64)
+    confidence = np.empty(n, np.float64)
+    for i in range(n):
+        status[i], confidence[i] = decide(adx[i], ema20[i], ema50[i], macd_hist[i], adx_threshold)
+    return status, confidence
+
+
+@njit(cache=True)
+def _fmax(a, b):
+    """np.fmax for scalars: the non-NaN operand wins"""
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a > b else b
+
+
+@njit(cache=True)
+def true_range(high, low, close):
+    """
+    True range in one pass: max(high-low, |high-prev_close|, |low-prev_close|)
+
+    The first bar has no previous close and uses high-low; NaN operands are
+    skipped like np.fmax.
+    """
+    n = len(close)
+    tr = np.empty(n, np.float64)
+    if n == 0:
+        return tr
+    tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        tr[i] = _fmax(high[i] - low[i], _fmax(abs(high[i] - prev_close), abs(low[i] - prev_close)))
+    return tr
+
+
+def warmup():
+    """Compile (or load from the on-disk cache) every kernel before the first tick"""
+    decide(30.0, 2.0, 1.0, 0.1, 25.0)
+    ones = np.ones(2)
+    decide_batch(ones, ones, ones, ones, 25.0)
+    true_range(ones, ones, ones)
+
+
+if NUMBA_AVAILABLE:
+    try:
+        warmup()
+    except Exception as e:
+        logger.warning(f"Trading kernel warmup failed: {str(e)}")
@@ -59,6 +59,7 @@ class EnhancedAIController:
         # Original ai.py performance tracking
         self.start_trade = dt.datetime.now(timezone.utc)
         self.last_trade_time = dt.datetime.now(timezone.utc)
+        self._last_trade_mono = time.monotonic()  # interval math in can_trade
         self.trade_count = 0
         self.win_count = 0
         self.lose_count = 0
@@ -213,11 +214,10 @@ class EnhancedAIController:
         """
         try:
             # Original time-based constraint
-            current_time = dt.datetime.now(timezone.utc)
-            time_since_last_trade = current_time - self.last_trade_time
+            time_since_last_trade = time.monotonic() - self._last_trade_mono
             
             trade_interval = getattr(settings, 'trade_interval', 60)
-            if time_since_last_trade.total_seconds() < trade_interval:
+            if time_since_last_trade < trade_interval:
                 return False
             
             # GitHub project's risk management check
@@ -429,6 +429,7 @@ class EnhancedAIController:
                     indicators_data=df.iloc[-1].to_dict() if df is not None else {}
                 )
                 self.last_trade_time = dt.datetime.now(timezone.utc)
+                self._last_trade_mono = time.monotonic()
                 logger.info(f'Buy order executed: {position_size} {self.product_code} at {current_price}')
                 return True
             else:
@@ -478,6 +479,7 @@ class EnhancedAIController:
                     indicators_data=df.iloc[-1].to_dict() if df is not None else {}
                 )
                 self.last_trade_time = dt.datetime.now(timezone.utc)
+                self._last_trade_mono = time.monotonic()
                 logger.info(f'Sell order executed: {total_amount} {self.product_code} at {current_price}')
                 return True
             else:
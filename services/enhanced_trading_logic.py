@@ -1,18 +1,40 @@
+import bisect
 import logging
+import time
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# トレンド強度(絶対値)ごとの必要シグナル強度: <=0.01 → 0.5, <=0.02 → 0.8, >0.02 → 0.7
+_TREND_STRENGTH_THRESHOLDS = (0.01, 0.02)
+_MIN_SIGNAL_STRENGTHS = (0.5, 0.8, 0.7)
+
+_UP_TRENDS = frozenset(('UP', 'STRONG_UP'))
+_DOWN_TRENDS = frozenset(('DOWN', 'STRONG_DOWN'))
+
+# should_trade_batch のトレンド方向コード別テーブル
+# コード: 0=STRONG_DOWN, 1=DOWN, 2=NEUTRAL, 3=UP, 4=STRONG_UP
+_TREND_NEUTRAL = 2
+_RSI_BUY_LIMITS = np.array([-np.inf, -np.inf, 30.0, 35.0, 40.0])  # rsi < limit で買いシグナル
+_RSI_BUY_WEIGHTS = np.array([0.0, 0.0, 0.4, 0.6, 0.7])
+_RSI_SELL_LIMITS = np.array([60.0, 65.0, 70.0, np.inf, np.inf])  # rsi > limit で売りシグナル
+_RSI_SELL_WEIGHTS = np.array([0.7, 0.6, 0.4, 0.0, 0.0])
+_BB_BUY_WEIGHTS = np.array([0.0, 0.0, 0.3, 0.6, 0.6])
+_BB_SELL_WEIGHTS = np.array([0.6, 0.6, 0.3, 0.0, 0.0])
+
 class EnhancedTradingLogic:
     """
     強化されたトレーディングロジック - トレンドフィルター付き
     下降トレンド中の騙しシグナルを排除
     """
 
+    __slots__ = ('last_trade_time', '_last_trade_mono', 'min_trade_interval')
+
     def __init__(self):
         self.last_trade_time = None
+        self._last_trade_mono = None  # monotonic clock of last_trade_time (interval checks)
         self.min_trade_interval = 0
 
     def should_trade(self, market_data):
@@ -20,25 +42,34 @@ class EnhancedTradingLogic:
         トレンドフィルター付き取引判定
         """
         try:
-            current_price = market_data.get('close', 0)
-            rsi = market_data.get('rsi', market_data.get('rsi_14', 50))  # Try 'rsi' first, fallback to 'rsi_14'
-            macd_line = market_data.get('macd_line', 0)
-            macd_signal = market_data.get('macd_signal', 0)
-            bb_upper = market_data.get('bb_upper', current_price * 1.02)
-            bb_lower = market_data.get('bb_lower', current_price * 0.98)
-            bb_middle = market_data.get('bb_middle', current_price)
-            ema_20 = market_data.get('ema_20', current_price)
-            ema_50 = market_data.get('ema_50', current_price)  # 長期トレンド用
-
-            # Log current indicator values
-            logger.info(f"📊 Indicator Values: Price={current_price:.3f}, RSI={rsi:.2f}, MACD={macd_line:.4f}/{macd_signal:.4f}, BB={bb_lower:.3f}/{bb_upper:.3f}, EMA20/50={ema_20:.3f}/{ema_50:.3f}")
+            # クールダウン中は分析自体をスキップ
+            if not self.check_trade_timing():
+                logger.debug("Trade interval cooldown active - skipping signal analysis")
+                return False, None, "cooldown", 0.0
+
+            md_get = market_data.get
+            current_price = md_get('close', 0)
+            rsi = md_get('rsi', md_get('rsi_14', 50))  # Try 'rsi' first, fallback to 'rsi_14'
+            macd_line = md_get('macd_line', 0)
+            macd_signal = md_get('macd_signal', 0)
+            bb_upper = md_get('bb_upper', current_price * 1.02)
+            bb_lower = md_get('bb_lower', current_price * 0.98)
+            ema_20 = md_get('ema_20', current_price)
+            ema_50 = md_get('ema_50', current_price)  # 長期トレンド用
+
+            # Log current indicator values (%-style: formatted only when INFO is enabled)
+            logger.info("📊 Indicator Values: Price=%.3f, RSI=%.2f, MACD=%.4f/%.4f, BB=%.3f/%.3f, EMA20/50=%.3f/%.3f", current_price, rsi, macd_line, macd_signal, bb_lower, bb_upper, ema_20, ema_50)
 
             # === 1. トレンド分析（最重要） ===
-            trend_analysis = self._analyze_market_trend(market_data)
+            trend_analysis = self._trend_from_values(current_price, ema_20, ema_50)
             trend_direction = trend_analysis['direction']
+            # 方向を一度だけ真偽値に変換（以降のシグナル判定は文字列比較なし）
+            is_up = trend_direction in _UP_TRENDS
+            is_down = trend_direction in _DOWN_TRENDS
+            is_neutral = not (is_up or is_down)
             trend_strength = trend_analysis['strength']
 
-            logger.info(f"Trend Analysis - Direction: {trend_direction}, Strength: {trend_strength:.3f}")
+            logger.info("Trend Analysis - Direction: %s, Strength: %.3f", trend_direction, trend_strength)
 
             signals = []
 
@@ -47,114 +78,112 @@ class EnhancedTradingLogic:
                 # 強い下降トレンド中は逆張り禁止 - トレンドフォロー徹底
                 if rsi > 60:  # 下降中の戻りは売りチャンス
                     signals.append(('SELL', 'RSI Pullback in Downtrend', 0.7))
-                    logger.info(f"Trend-Following RSI Sell: {rsi:.2f} > 60 in strong downtrend")
+                    logger.info("Trend-Following RSI Sell: %.2f > 60 in strong downtrend", rsi)
                 elif rsi < 20:
                     # 極端な売られすぎでも逆張りしない - ログのみ
-                    logger.info(f"RSI Extreme Oversold: {rsi:.2f} < 20, but NO contrarian trade in downtrend (falling knife)")
+                    logger.info("RSI Extreme Oversold: %.2f < 20, but NO contrarian trade in downtrend (falling knife)", rsi)
             elif trend_direction == 'DOWN':
                 # 下降トレンド中
                 if rsi > 65:
                     signals.append(('SELL', 'RSI Resistance in Downtrend', 0.6))
-                    logger.info(f"RSI Sell: {rsi:.2f} > 65 in downtrend")
+                    logger.info("RSI Sell: %.2f > 65 in downtrend", rsi)
             elif trend_direction == 'STRONG_UP':
                 # 強い上昇トレンド中は押し目買い
                 if rsi < 40:  # 上昇中の押し目は買いチャンス
                     signals.append(('BUY', 'RSI Dip in Uptrend', 0.7))
-                    logger.info(f"Trend-Following RSI Buy: {rsi:.2f} < 40 in strong uptrend")
+                    logger.info("Trend-Following RSI Buy: %.2f < 40 in strong uptrend", rsi)
                 elif rsi > 80:
                     # 極端な買われすぎでも逆張りしない - ログのみ
-                    logger.info(f"RSI Extreme Overbought: {rsi:.2f} > 80, but NO contrarian trade in uptrend")
+                    logger.info("RSI Extreme Overbought: %.2f > 80, but NO contrarian trade in uptrend", rsi)
             elif trend_direction == 'UP':
                 # 上昇トレンド中
                 if rsi < 35:
                     signals.append(('BUY', 'RSI Dip in Uptrend', 0.6))
-                    logger.info(f"RSI Buy: {rsi:.2f} < 35 in uptrend")
+                    logger.info("RSI Buy: %.2f < 35 in uptrend", rsi)
             else:
                 # 中立時のみ逆張り許可
                 if rsi < 30:
                     signals.append(('BUY', 'RSI Oversold Neutral', 0.4))
-                    logger.info(f"RSI Buy: {rsi:.2f} < 30 (neutral market)")
+                    logger.info("RSI Buy: %.2f < 30 (neutral market)", rsi)
                 elif rsi > 70:
                     signals.append(('SELL', 'RSI Overbought Neutral', 0.4))
-                    logger.info(f"RSI Sell: {rsi:.2f} > 70 (neutral market)")
+                    logger.info("RSI Sell: %.2f > 70 (neutral market)", rsi)
 
             # === 3. MACDシグナル（トレンドフォロー重視） ===
             macd_diff = abs(macd_line - macd_signal)
 
             if macd_line > macd_signal:
                 # MACDブリッシュクロスオーバー
-                if trend_direction in ['UP', 'STRONG_UP', 'NEUTRAL']:
+                if not is_down:
                     # 上昇トレンドまたは中立時のみBUYシグナル
                     if macd_line > 0:
                         # ポジティブゾーンでのクロスオーバー
                         if macd_diff > 0.5:
                             signals.append(('BUY', 'MACD Strong Bullish + Uptrend', 1.5))
-                            logger.info(f"🔥 MACD Buy: Strong positive crossover in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("🔥 MACD Buy: Strong positive crossover in %s (diff: %.3f)", trend_direction, macd_diff)
                         else:
                             signals.append(('BUY', 'MACD Bullish + Uptrend', 1.2))
-                            logger.info(f"⚡ MACD Buy: Positive crossover in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("⚡ MACD Buy: Positive crossover in %s (diff: %.3f)", trend_direction, macd_diff)
                     else:
                         # ネガティブゾーンからの転換（反転シグナル）
-                        if trend_direction == 'NEUTRAL':
+                        if is_neutral:
                             signals.append(('BUY', 'MACD Reversal Neutral', 0.9))
-                            logger.info(f"📈 MACD Buy: Reversal from negative in neutral market (diff: {macd_diff:.3f})")
+                            logger.info("📈 MACD Buy: Reversal from negative in neutral market (diff: %.3f)", macd_diff)
                         else:
                             signals.append(('BUY', 'MACD Reversal + Uptrend', 1.0))
-                            logger.info(f"📈 MACD Buy: Reversal from negative in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("📈 MACD Buy: Reversal from negative in %s (diff: %.3f)", trend_direction, macd_diff)
                 else:
                     # 下降トレンド中のMACDブリッシュは無視（騙しの可能性）
-                    logger.info(f"MACD IGNORED: Bullish crossover in downtrend (falling knife risk, diff: {macd_diff:.3f})")
+                    logger.info("MACD IGNORED: Bullish crossover in downtrend (falling knife risk, diff: %.3f)", macd_diff)
 
             elif macd_line < macd_signal:
                 # MACDベアリッシュクロスアンダー
-                if trend_direction in ['DOWN', 'STRONG_DOWN', 'NEUTRAL']:
+                if not is_up:
                     # 下降トレンドまたは中立時のみSELLシグナル
                     if macd_line < 0:
                         # ネガティブゾーンでのクロスアンダー
                         if macd_diff > 0.5:
                             signals.append(('SELL', 'MACD Strong Bearish + Downtrend', 1.5))
-                            logger.info(f"🔥 MACD Sell: Strong negative crossunder in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("🔥 MACD Sell: Strong negative crossunder in %s (diff: %.3f)", trend_direction, macd_diff)
                         else:
                             signals.append(('SELL', 'MACD Bearish + Downtrend', 1.2))
-                            logger.info(f"⚡ MACD Sell: Negative crossunder in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("⚡ MACD Sell: Negative crossunder in %s (diff: %.3f)", trend_direction, macd_diff)
                     else:
                         # ポジティブゾーンからの転換（反転シグナル）
-                        if trend_direction == 'NEUTRAL':
+                        if is_neutral:
                             signals.append(('SELL', 'MACD Reversal Neutral', 0.9))
-                            logger.info(f"📉 MACD Sell: Reversal from positive in neutral market (diff: {macd_diff:.3f})")
+                            logger.info("📉 MACD Sell: Reversal from positive in neutral market (diff: %.3f)", macd_diff)
                         else:
                             signals.append(('SELL', 'MACD Reversal + Downtrend', 1.0))
-                            logger.info(f"📉 MACD Sell: Reversal from positive in {trend_direction} (diff: {macd_diff:.3f})")
+                            logger.info("📉 MACD Sell: Reversal from positive in %s (diff: %.3f)", trend_direction, macd_diff)
                 else:
                     # 上昇トレンド中のMACDベアリッシュは無視（騙しの可能性）
-                    logger.info(f"MACD IGNORED: Bearish crossunder in uptrend (temporary pullback, diff: {macd_diff:.3f})")
+                    logger.info("MACD IGNORED: Bearish crossunder in uptrend (temporary pullback, diff: %.3f)", macd_diff)
 
             # === 4. Bollinger Bands（トレンドフォロー） ===
-            bb_position = (current_price - bb_lower) / (bb_upper - bb_lower) if (bb_upper - bb_lower) > 0 else 0.5
-
             if current_price < bb_lower * 1.01:  # BB下限近く
-                if trend_direction in ['UP', 'STRONG_UP']:
+                if is_up:
                     # 上昇トレンド中のBB下限タッチは押し目買いチャンス
                     signals.append(('BUY', 'BB Dip in Uptrend', 0.6))
-                    logger.info(f"BB Buy: Lower band bounce in uptrend")
-                elif trend_direction == 'NEUTRAL':
+                    logger.info("BB Buy: Lower band bounce in uptrend")
+                elif is_neutral:
                     signals.append(('BUY', 'BB Bounce Neutral', 0.3))
-                    logger.info(f"Weak BB Buy: Lower band in neutral market")
+                    logger.info("Weak BB Buy: Lower band in neutral market")
                 else:
                     # 下降トレンド中のBB下限は落ちるナイフ - 無視
-                    logger.info(f"BB IGNORED: Lower band in downtrend (falling knife)")
+                    logger.info("BB IGNORED: Lower band in downtrend (falling knife)")
 
             elif current_price > bb_upper * 0.99:  # BB上限近く
-                if trend_direction in ['DOWN', 'STRONG_DOWN']:
+                if is_down:
                     # 下降トレンド中のBB上限タッチは戻り売りチャンス
                     signals.append(('SELL', 'BB Rally in Downtrend', 0.6))
-                    logger.info(f"BB Sell: Upper band resistance in downtrend")
-                elif trend_direction == 'NEUTRAL':
+                    logger.info("BB Sell: Upper band resistance in downtrend")
+                elif is_neutral:
                     signals.append(('SELL', 'BB Reversal Neutral', 0.3))
-                    logger.info(f"Weak BB Sell: Upper band in neutral market")
+                    logger.info("Weak BB Sell: Upper band in neutral market")
                 else:
                     # 上昇トレンド中のBB上限は強さの証 - 無視
-                    logger.info(f"BB IGNORED: Upper band in uptrend (strong momentum)")
+                    logger.info("BB IGNORED: Upper band in uptrend (strong momentum)")
 
             # === 5. EMAトレンド確認（トレンド方向のみ） ===
             if ema_20 > ema_50:  # 上昇トレンド配置
@@ -173,20 +202,18 @@ class EnhancedTradingLogic:
             buy_strength = sum([s[2] for s in buy_signals])
             sell_strength = sum([s[2] for s in sell_signals])
 
-            # トレンド強度に応じた閾値調整（トレンドフォロー重視）
-            if abs(trend_strength) > 0.02:  # 強いトレンド
-                min_signal_strength = 0.7  # トレンド方向は積極的
-            elif abs(trend_strength) > 0.01:  # 中程度トレンド
-                min_signal_strength = 0.8  # 中程度は慎重に
-            else:  # 弱いトレンド/中立
-                min_signal_strength = 0.5  # 中立時は標準的
-
-            logger.info(f"Enhanced Signal Analysis:")
-            logger.info(f"  Buy Strength: {buy_strength:.2f}")
-            logger.info(f"  Sell Strength: {sell_strength:.2f}")
-            logger.info(f"  Required Threshold: {min_signal_strength:.2f}")
-            logger.info(f"  Buy Signals: {[f'{s[1]}({s[2]})' for s in buy_signals]}")
-            logger.info(f"  Sell Signals: {[f'{s[1]}({s[2]})' for s in sell_signals]}")
+            # トレンド強度に応じた閾値調整（強いトレンドは積極的、中程度は慎重に、中立は標準的）
+            min_signal_strength = _MIN_SIGNAL_STRENGTHS[
+                bisect.bisect_left(_TREND_STRENGTH_THRESHOLDS, abs(trend_strength))
+            ]
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Enhanced Signal Analysis:")
+                logger.info(f"  Buy Strength: {buy_strength:.2f}")
+                logger.info(f"  Sell Strength: {sell_strength:.2f}")
+                logger.info(f"  Required Threshold: {min_signal_strength:.2f}")
+                logger.info(f"  Buy Signals: {[f'{s[1]}({s[2]})' for s in buy_signals]}")
+                logger.info(f"  Sell Signals: {[f'{s[1]}({s[2]})' for s in sell_signals]}")
 
             # 最終判定
             if buy_strength >= min_signal_strength and buy_strength > sell_strength:
@@ -197,23 +224,110 @@ class EnhancedTradingLogic:
                 return True, 'SELL', f"Enhanced Sell: {', '.join(reasons)}", sell_strength
 
             # シグナル不足
-            logger.info(f"No strong signal - Buy: {buy_strength:.2f}, Sell: {sell_strength:.2f}, Required: {min_signal_strength:.2f}")
+            logger.info("No strong signal - Buy: %.2f, Sell: %.2f, Required: %.2f", buy_strength, sell_strength, min_signal_strength)
             return False, None, "No clear enhanced signal", max(buy_strength, sell_strength)
 
         except Exception as e:
             logger.error(f"Error in enhanced trading decision: {e}")
             return False, None, f"Error: {str(e)}", 0.0
 
+    def should_trade_batch(self, df):
+        """
+        全バーの取引判定をNumPyで一括計算（バックテスト用）
+
+        Each row gets the decision should_trade makes for that row as market_data
+        (cooldown is not applied and reasons are not built).
+
+        Returns:
+            DataFrame with should_trade, trade_type, confidence per row
+        """
+        def col(name, default):
+            return df[name].to_numpy(dtype=np.float64) if name in df.columns else default
+
+        price = col('close', np.zeros(len(df)))
+        if 'rsi' in df.columns:
+            rsi = col('rsi', None)
+        else:
+            rsi = col('rsi_14', np.full(len(df), 50.0))
+        macd_line = col('macd_line', np.zeros(len(df)))
+        macd_signal = col('macd_signal', np.zeros(len(df)))
+        bb_upper = col('bb_upper', price * 1.02)
+        bb_lower = col('bb_lower', price * 0.98)
+        ema_20 = col('ema_20', price)
+        ema_50 = col('ema_50', price)
+
+        # === 1. トレンド分析（_trend_from_values と同じ閾値、EMA=0 は中立扱い） ===
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend_strength = ((price - ema_20) / ema_20 + (ema_20 - ema_50) / ema_50) / 2
+        trend_strength = np.where((ema_20 == 0) | (ema_50 == 0), 0.0, trend_strength)
+        # 方向コード 0..4 を比較の和で分岐なしに求める（NaN はどの比較も偽 → NEUTRAL）
+        trend_code = (
+            _TREND_NEUTRAL
+            + (trend_strength > 0.005).astype(np.intp) + (trend_strength > 0.02)
+            - (trend_strength < -0.005) - (trend_strength < -0.02)
+        )
+        neutral = trend_code == _TREND_NEUTRAL
+        up_or_neutral = trend_code >= _TREND_NEUTRAL
+        down_or_neutral = trend_code <= _TREND_NEUTRAL
+
+        # === 2. RSI（方向別の閾値・重みをテーブル参照） ===
+        rsi_buy = np.where(rsi < _RSI_BUY_LIMITS[trend_code], _RSI_BUY_WEIGHTS[trend_code], 0.0)
+        rsi_sell = np.where(rsi > _RSI_SELL_LIMITS[trend_code], _RSI_SELL_WEIGHTS[trend_code], 0.0)
+
+        # === 3. MACD ===
+        strong_diff = np.abs(macd_line - macd_signal) > 0.5
+        bullish = (macd_line > macd_signal) & up_or_neutral
+        bearish = (macd_line < macd_signal) & down_or_neutral
+        macd_buy = np.where(bullish, np.where(macd_line > 0, np.where(strong_diff, 1.5, 1.2),
+                                              np.where(neutral, 0.9, 1.0)), 0.0)
+        macd_sell = np.where(bearish, np.where(macd_line < 0, np.where(strong_diff, 1.5, 1.2),
+                                               np.where(neutral, 0.9, 1.0)), 0.0)
+
+        # === 4. Bollinger Bands ===
+        near_lower = price < bb_lower * 1.01
+        near_upper = ~near_lower & (price > bb_upper * 0.99)
+        bb_buy = np.where(near_lower, _BB_BUY_WEIGHTS[trend_code], 0.0)
+        bb_sell = np.where(near_upper, _BB_SELL_WEIGHTS[trend_code], 0.0)
+
+        # === 5. EMA ===
+        ema_buy = np.where((ema_20 > ema_50) & (price > ema_20 * 1.01), 0.5, 0.0)
+        ema_sell = np.where((ema_20 < ema_50) & (price < ema_20 * 0.99), 0.5, 0.0)
+
+        # === 6. シグナル統合・判定 ===
+        buy_strength = rsi_buy + macd_buy + bb_buy + ema_buy
+        sell_strength = rsi_sell + macd_sell + bb_sell + ema_sell
+        abs_strength = np.abs(trend_strength)
+        abs_strength[np.isnan(abs_strength)] = 0.0  # NaN fails every threshold, as in the scalar path
+        min_signal_strength = np.asarray(_MIN_SIGNAL_STRENGTHS)[
+            np.searchsorted(_TREND_STRENGTH_THRESHOLDS, abs_strength, side='left')
+        ]
+
+        is_buy = (buy_strength >= min_signal_strength) & (buy_strength > sell_strength)
+        is_sell = ~is_buy & (sell_strength >= min_signal_strength) & (sell_strength > buy_strength)
+        trade_type = np.select([is_buy, is_sell], ['BUY', 'SELL'], None).astype(object)
+
+        return pd.DataFrame({
+            'should_trade': is_buy | is_sell,
+            'trade_type': trade_type,
+            'confidence': np.where(is_sell, sell_strength,
+                                   np.where(is_buy, buy_strength, np.maximum(buy_strength, sell_strength))),
+        }, index=df.index)
+
     def _analyze_market_trend(self, market_data):
         """
         市場トレンド分析 - 過去20期間の価格動向
         """
-        try:
-            # 簡易的なトレンド計算（実際は過去データの配列が必要）
-            current_price = market_data.get('close', 0)
-            ema_20 = market_data.get('ema_20', current_price)
-            ema_50 = market_data.get('ema_50', current_price)
+        # 簡易的なトレンド計算（実際は過去データの配列が必要）
+        current_price = market_data.get('close', 0)
+        return self._trend_from_values(
+            current_price,
+            market_data.get('ema_20', current_price),
+            market_data.get('ema_50', current_price),
+        )
 
+    def _trend_from_values(self, current_price, ema_20, ema_50):
+        """終値・EMA20/50からトレンド方向と強度を判定"""
+        try:
             # EMAベースのトレンド強度
             price_ema_diff = (current_price - ema_20) / ema_20
             ema_trend = (ema_20 - ema_50) / ema_50
@@ -251,11 +365,12 @@ class EnhancedTradingLogic:
 
     def check_trade_timing(self):
         """取引タイミングチェック"""
-        if not self.last_trade_time:
+        # 間隔0（デフォルト）なら経過時間に関係なく常に可: 時計を読まない
+        if self._last_trade_mono is None or self.min_trade_interval <= 0:
             return True
-        time_since_last = (datetime.now() - self.last_trade_time).total_seconds()
-        return time_since_last >= self.min_trade_interval
+        return time.monotonic() - self._last_trade_mono >= self.min_trade_interval
 
     def record_trade(self):
         """取引記録"""
-        self.last_trade_time = datetime.now()
\ No newline at end of file
+        self.last_trade_time = datetime.now()  # wall-clock time kept for callers
+        self._last_trade_mono = time.monotonic()
\ No newline at end of file
@@ -1,20 +1,503 @@
+import atexit
+import functools
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
-from datetime import datetime
+import queue
+import signal
+import sqlite3
+import sys
+import threading
+import time
 import json
 
-# Create logs directory if it doesn't exist
-os.makedirs('logs', exist_ok=True)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/trading_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Size-based rotation for every file this module writes
+_LOG_MAX_BYTES = 10 * 1024 * 1024
+_LOG_BACKUP_COUNT = 5
+
+class _Utf8:
+    """Log argument that decodes a serialized payload only when a handler formats it"""
+    __slots__ = ('payload',)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        return self.payload.decode('utf-8')
+
+# Argument types that cannot change after the call, so %-formatting them later on
+# the listener thread gives the same message
+_DEFERRABLE_ARG_TYPES = frozenset((str, int, float, bool, bytes, type(None), _Utf8))
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves %-formatting to the listener thread
+    Records with a str message and immutable args are queued as-is; anything else
+    (mutable args, exc_info/stack_info) is formatted here like QueueHandler does
+    """
+
+    def prepare(self, record):
+        args = record.args
+        if (type(record.msg) is str and not record.exc_info and not record.stack_info
+                and type(args) is tuple and all(type(a) in _DEFERRABLE_ARG_TYPES for a in args)):
+            return record
+        return super().prepare(record)
+
+@functools.lru_cache(maxsize=1)
+def _init_once():
+    """Create the logs directory and configure root logging (idempotent)"""
+    # Create logs directory if it doesn't exist
+    if not os.path.isdir('logs'):
+        os.makedirs('logs', exist_ok=True)
+
+    # Configure logging, unless the application already did
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    # Callers only enqueue records; file/stderr IO and (for immutable args)
+    # %-formatting run on the listener thread
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = RotatingFileHandler('logs/trading_bot.log', maxBytes=_LOG_MAX_BYTES, backupCount=_LOG_BACKUP_COUNT)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root.setLevel(logging.INFO)
+    root.addHandler(_DeferredFormatQueueHandler(log_queue))
+
+_init_once()
+
+if ORJSON_AVAILABLE:
+    # OPT_NON_STR_KEYS: coerce int/float/etc. dict keys to strings like json.dumps does
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(data):
+        """Serialize log data to UTF-8 JSON bytes"""
+        return orjson.dumps(data, option=_ORJSON_OPTIONS)
+
+    _loads = orjson.loads
+
+    # orjson already beats a hand-written template on fixed-schema events
+    _dumps_trade_execution = _dumps
+else:
+    def _dumps(data):
+        """Serialize log data to UTF-8 JSON bytes"""
+        return json.dumps(data).encode('utf-8')
+
+    _loads = json.loads
+
+    _encode_str = json.encoder.encode_basestring_ascii
+    _TRADE_EXECUTION_TEMPLATE = (
+        '{"timestamp": %s, "event": "trade_execution", "trade_id": %s, '
+        '"currency_pair": %s, "trade_type": %s, "amount": %s, "price": %s, "is_bot": %s}'
+    )
+
+    def _dumps_trade_execution(data):
+        """
+        Fixed-schema serializer for trade_execution events
+        Produces the same bytes as json.dumps without the generic encoder dispatch
+        """
+        trade_id = data['trade_id']
+        is_bot = data['is_bot']
+        strings = (data['timestamp'], data['currency_pair'], data['trade_type'], data['amount'], data['price'])
+        if (type(trade_id) is not int and trade_id is not None) or type(is_bot) is not bool \
+                or not all(type(v) is str for v in strings):
+            return _dumps(data)
+
+        timestamp, currency_pair, trade_type, amount, price = map(_encode_str, strings)
+        return (_TRADE_EXECUTION_TEMPLATE % (
+            timestamp,
+            'null' if trade_id is None else trade_id,
+            currency_pair,
+            trade_type,
+            amount,
+            price,
+            'true' if is_bot else 'false',
+        )).encode('ascii')
+
+_ts_cache = (None, '')
+
+def _timestamp():
+    """
+    Local-time ISO 8601 timestamp, same format as datetime.now().isoformat()
+    The 'YYYY-MM-DDTHH:MM:SS' prefix is formatted once per second and reused
+    """
+    global _ts_cache
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(sec))
+        _ts_cache = (sec, prefix)
+    us = ns // 1000
+    return f"{prefix}.{us:06d}" if us else prefix
+
+def _tail_lines(path, limit, block_size=64 * 1024):
+    """
+    Return the last `limit` lines of a file as bytes
+    Reads backwards from the end, doubling the window until enough lines are found
+    """
+    if limit <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        window = block_size
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read(size - start).splitlines()
+            if start == 0 or len(lines) > limit:
+                break
+            window *= 2
+
+    if start > 0:
+        lines = lines[1:]  # First line of the window may be partial
+    return lines[-limit:]
+
+_LOG_EXEC = logging.getLogger('trade_execution')
+_LOG_CLOSE = logging.getLogger('trade_close')
+_LOG_API = logging.getLogger('api_error')
+_LOG_SIG = logging.getLogger('strategy_signal')
+_LOG_MKT = logging.getLogger('market_data')
+_LOG_ERR = logging.getLogger('trade_logger')
+
+_LOG_PATHS = {
+    'trades': 'logs/trades.log',
+    'errors': 'logs/errors.log',
+    'signals': 'logs/signals.log',
+}
+_TRADE_DB_PATH = 'logs/trades.db'
+_TRADE_DB_MAX_ROWS = 10000  # newest trade events kept in trades.db
+_TRADE_DB_PRUNE_EVERY = 1000  # inserted rows between prunes
+
+class _TradeIndex:
+    """
+    SQLite (WAL) index of the newest trade events
+    Lets get_recent_trades fetch the newest rows by primary key instead of scanning trades.log.
+    trades.log (with its rotations) is the authoritative record: rows are added only after
+    their trades.log write succeeded, the table is capped at max_rows, and a deleted
+    trades.db is rebuilt from trades.log on the next write.
+    """
+
+    def __init__(self, path, log_path, max_rows=_TRADE_DB_MAX_ROWS):
+        self.path = path
+        self.log_path = log_path
+        self.max_rows = max_rows
+        self._conn = None
+        self._since_prune = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Connect (creating and backfilling the table from trades.log on first use)"""
+        with self._lock:
+            self._connect()
+
+    def insert_many(self, rows):
+        """Insert (timestamp, payload) rows in one transaction, pruning the oldest rows periodically"""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany('INSERT INTO trades(ts, payload) VALUES (?, ?)', rows)
+            self._since_prune += len(rows)
+            if self._since_prune >= _TRADE_DB_PRUNE_EVERY:
+                self._prune(conn)
+            conn.commit()
+
+    def recent(self, limit):
+        """Return the newest `limit` payloads, newest first"""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT payload FROM trades ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='trades'"
+            ).fetchone()
+            if not exists:
+                conn.execute('CREATE TABLE trades(id INTEGER PRIMARY KEY, ts TEXT, payload BLOB)')
+                try:
+                    self._backfill(conn)
+                except Exception:
+                    # Leave no half-seeded table behind, so the next open retries the backfill
+                    conn.rollback()
+                    conn.execute('DROP TABLE IF EXISTS trades')
+                    conn.close()
+                    raise
+            self._prune(conn)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _prune(self, conn):
+        conn.execute('DELETE FROM trades WHERE id <= (SELECT max(id) FROM trades) - ?', (self.max_rows,))
+        self._since_prune = 0
+
+    def _backfill(self, conn):
+        # Seed a new database from the existing text log so trade history is kept
+        if not os.path.exists(self.log_path):
+            return
+
+        rows = []
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                try:
+                    obj = _loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(obj, dict):
+                    continue
+                rows.append((obj.get('timestamp'), line))
+                if len(rows) >= 1000:
+                    conn.executemany('INSERT INTO trades(ts, payload) VALUES (?, ?)', rows)
+                    rows = []
+        if rows:
+            conn.executemany('INSERT INTO trades(ts, payload) VALUES (?, ?)', rows)
+
+class _LogFileWriter:
+    """
+    Background writer for the per-event log files
+    Keeps one append handle per file and writes queued lines in batches
+    """
+
+    def __init__(self, paths, trade_index=None, max_batch=256, linger=0.005,
+                 max_bytes=_LOG_MAX_BYTES, backup_count=_LOG_BACKUP_COUNT):
+        self.paths = paths
+        self.trade_index = trade_index
+        self.max_batch = max_batch
+        self.linger = linger
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue = queue.Queue()
+        self._fds = {}
+        self._retry_at = {}
+        self._backoff = {}
+        self._rotate_failed = set()
+        self.dropped = 0
+        self._reopen_requested = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, name, payload, timestamp=None):
+        """Queue one serialized line for the named log file"""
+        if self._thread is None:
+            self._start()
+        self._queue.put((name, payload, timestamp))
+
+    def flush(self, timeout=5.0):
+        """Block until every queued line has been written, the writer dies or the timeout expires"""
+        # queue.join() with a timeout and a liveness check, so a reader never hangs on a dead writer
+        deadline = time.monotonic() + timeout
+        q = self._queue
+        with q.all_tasks_done:
+            while q.unfinished_tasks and self._thread is not None and self._thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                q.all_tasks_done.wait(min(remaining, 0.1))
+
+    def reopen(self):
+        """Reopen the log files before the next write (after logrotate moves them)"""
+        self._reopen_requested = True
+
+    def close(self):
+        """Drain the queue and close all file descriptors"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._close_fds()
+        if self.trade_index is not None:
+            self.trade_index.close()
+
+    def _discard_fd(self, name):
+        fd = self._fds.pop(name, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _close_fds(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trade-log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Wait briefly so a tick's burst of events shares one writev()
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.max_batch and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+            items = [item for item in batch if item is not None]
+            try:
+                self._write_batch(items)
+            except Exception as e:
+                # Keep the writer alive; this batch is lost but later lines still get written
+                self._drop('queued', len(items), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        if self._reopen_requested:
+            self._reopen_requested = False
+            self._close_fds()
+
+        lines = {}
+        trade_rows = []
+        for name, payload, timestamp in batch:
+            lines.setdefault(name, []).append(payload)
+            if name == 'trades':
+                trade_rows.append((timestamp, payload))
+
+        # Open (and on first run backfill) the index before appending to
+        # trades.log, so the backfill does not pick up this batch as well
+        index_trades = bool(trade_rows) and self.trade_index is not None
+        if index_trades:
+            try:
+                self.trade_index.open()
+            except (sqlite3.Error, OSError) as e:
+                index_trades = False
+                _LOG_ERR.error(f"Error indexing trades: {e}")
+
+        now = time.monotonic()
+        for name, payloads in lines.items():
+            if now < self._retry_at.get(name, 0.0):
+                self._drop(name, len(payloads), None)
+                continue
+
+            try:
+                fd = self._fds.get(name)
+                if fd is None:
+                    fd = self._fds[name] = os.open(self.paths[name], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self._write_lines(fd, payloads)
+                if name == 'trades' and index_trades:
+                    # Index only what reached trades.log, so the two stores agree
+                    try:
+                        self.trade_index.insert_many(trade_rows)
+                    except sqlite3.Error as e:
+                        _LOG_ERR.error(f"Error indexing trades: {e}")
+                self._backoff.pop(name, None)
+            except OSError as e:
+                # Back off (0.5s doubling up to 60s) and reopen on the next attempt
+                self._discard_fd(name)
+                backoff = min(self._backoff.get(name, 0.25) * 2, 60.0)
+                self._backoff[name] = backoff
+                self._retry_at[name] = now + backoff
+                self._drop(name, len(payloads), e)
+                continue
+
+            if self.max_bytes:
+                # The lines are already written, so a failed rotation is only logged
+                # (once until it succeeds) and retried after a later batch
+                try:
+                    if os.fstat(fd).st_size > self.max_bytes:
+                        self._rotate(name)
+                    self._rotate_failed.discard(name)
+                except OSError as e:
+                    self._discard_fd(name)
+                    if name not in self._rotate_failed:
+                        self._rotate_failed.add(name)
+                        _LOG_ERR.error(f"Error rotating {self.paths[name]}: {e}")
+
+    def _drop(self, name, count, error):
+        # Report straight to stderr (not through logging, whose file may be
+        # failing too) on the first drop and every 100 dropped lines after
+        previous = self.dropped
+        self.dropped += count
+        if previous == 0 or previous // 100 != self.dropped // 100:
+            reason = f": {error}" if error else " (backing off)"
+            sys.stderr.write(f"TradeLogger dropped {count} {name} log line(s), {self.dropped} total{reason}\n")
+
+    def _rotate(self, name):
+        # Same naming as RotatingFileHandler: path -> path.1 -> ... -> path.N
+        os.close(self._fds.pop(name))
+        path = self.paths[name]
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{path}.{i + 1}")
+            os.replace(path, f"{path}.1")
+        else:
+            os.truncate(path, 0)
+
+    @staticmethod
+    def _write_lines(fd, payloads):
+        # payload/newline pairs go out in one writev() without concatenating
+        # into an intermediate buffer; max_batch keeps this under IOV_MAX
+        total = sum(len(p) for p in payloads) + len(payloads)
+        if hasattr(os, 'writev'):
+            iov = []
+            for payload in payloads:
+                iov.append(payload)
+                iov.append(b'\n')
+            written = os.writev(fd, iov)
+            if written == total:
+                return
+        else:
+            written = 0
+
+        data = (b'\n'.join(payloads) + b'\n')[written:]
+        while data:
+            data = data[os.write(fd, data):]
+
+_trade_index = _TradeIndex(_TRADE_DB_PATH, _LOG_PATHS['trades'])
+_writer = _LogFileWriter(_LOG_PATHS, trade_index=_trade_index)
+atexit.register(_writer.close)
+
+def _install_sighup_reopen():
+    """Reopen the per-event log files on SIGHUP, chaining any existing handler"""
+    if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+        return
+
+    previous = signal.getsignal(signal.SIGHUP)
+
+    def _handle_sighup(signum, frame):
+        _writer.reopen()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGHUP, _handle_sighup)
+
+_install_sighup_reopen()
 
 class TradeLogger:
     """
@@ -26,9 +509,9 @@ class TradeLogger:
         """Log trade execution"""
         try:
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _timestamp(),
                 'event': 'trade_execution',
-                'trade_id': trade.id if hasattr(trade, 'id') else None,
+                'trade_id': getattr(trade, 'id', None),
                 'currency_pair': trade.currency_pair,
                 'trade_type': trade.trade_type,
                 'amount': str(trade.amount),
@@ -36,25 +519,23 @@ class TradeLogger:
                 'is_bot': is_bot
             }
             
-            logger = logging.getLogger('trade_execution')
-            logger.info(f"Trade executed: {json.dumps(log_data)}")
+            payload = _dumps_trade_execution(log_data)
+            _LOG_EXEC.info("Trade executed: %s", _Utf8(payload))
             
             # Save to separate trade log file
-            with open('logs/trades.log', 'a') as f:
-                f.write(f"{json.dumps(log_data)}\n")
+            _writer.write('trades', payload, log_data['timestamp'])
                 
-        except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error logging trade execution: {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            _LOG_ERR.error(f"Error logging trade execution: {e}")
     
     @staticmethod
     def log_trade_close(trade, closing_price, profit_loss, reason):
         """Log trade closure"""
         try:
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _timestamp(),
                 'event': 'trade_close',
-                'trade_id': trade.id if hasattr(trade, 'id') else None,
+                'trade_id': getattr(trade, 'id', None),
                 'currency_pair': trade.currency_pair,
                 'entry_price': str(trade.price),
                 'closing_price': str(closing_price),
@@ -62,46 +543,42 @@ class TradeLogger:
                 'reason': reason
             }
             
-            logger = logging.getLogger('trade_close')
-            logger.info(f"Trade closed: {json.dumps(log_data)}")
+            payload = _dumps(log_data)
+            _LOG_CLOSE.info("Trade closed: %s", _Utf8(payload))
             
             # Save to separate trade log file
-            with open('logs/trades.log', 'a') as f:
-                f.write(f"{json.dumps(log_data)}\n")
+            _writer.write('trades', payload, log_data['timestamp'])
                 
-        except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error logging trade close: {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            _LOG_ERR.error(f"Error logging trade close: {e}")
     
     @staticmethod
     def log_api_error(error_message, endpoint=None, params=None):
         """Log API errors"""
         try:
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _timestamp(),
                 'event': 'api_error',
                 'error_message': error_message,
                 'endpoint': endpoint,
                 'params': params
             }
             
-            logger = logging.getLogger('api_error')
-            logger.error(f"API Error: {json.dumps(log_data)}")
+            payload = _dumps(log_data)
+            _LOG_API.error("API Error: %s", _Utf8(payload))
             
             # Save to separate error log file
-            with open('logs/errors.log', 'a') as f:
-                f.write(f"{json.dumps(log_data)}\n")
+            _writer.write('errors', payload)
                 
-        except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error logging API error: {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            _LOG_ERR.error(f"Error logging API error: {e}")
     
     @staticmethod
     def log_strategy_signal(currency_pair, signal_type, probability, indicators):
         """Log trading strategy signals"""
         try:
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _timestamp(),
                 'event': 'strategy_signal',
                 'currency_pair': currency_pair,
                 'signal_type': signal_type,
@@ -114,77 +591,80 @@ class TradeLogger:
                 }
             }
             
-            logger = logging.getLogger('strategy_signal')
-            logger.info(f"Strategy signal: {json.dumps(log_data)}")
+            payload = _dumps(log_data)
+            _LOG_SIG.info("Strategy signal: %s", _Utf8(payload))
             
             # Save to separate signals log file
-            with open('logs/signals.log', 'a') as f:
-                f.write(f"{json.dumps(log_data)}\n")
+            _writer.write('signals', payload)
                 
-        except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error logging strategy signal: {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            _LOG_ERR.error(f"Error logging strategy signal: {e}")
     
     @staticmethod
     def log_market_data(currency_pair, price_data):
         """Log market data updates"""
+        if not _LOG_MKT.isEnabledFor(logging.DEBUG):
+            return
+
         try:
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _timestamp(),
                 'event': 'market_data',
                 'currency_pair': currency_pair,
                 'price_data': price_data
             }
             
-            logger = logging.getLogger('market_data')
-            logger.debug(f"Market data: {json.dumps(log_data)}")
+            _LOG_MKT.debug("Market data: %s", _Utf8(_dumps(log_data)))
             
-        except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error logging market data: {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            _LOG_ERR.error(f"Error logging market data: {e}")
     
     @staticmethod
     def get_recent_trades(limit=10):
-        """Get recent trade logs"""
+        """
+        Get recent trade logs, newest first
+        Always read from the shared trades.db (every process's trades, at most
+        _TRADE_DB_MAX_ROWS); each call returns freshly parsed dicts
+        """
         try:
-            if not os.path.exists('logs/trades.log'):
+            _writer.flush()
+            if limit <= 0:
                 return []
-            
+
             trades = []
-            with open('logs/trades.log', 'r') as f:
-                lines = f.readlines()
-                for line in lines[-limit:]:
-                    try:
-                        trades.append(json.loads(line.strip()))
-                    except json.JSONDecodeError:
-                        continue
-            
-            return trades[::-1]  # Reverse to get newest first
+            for payload in _trade_index.recent(limit):  # Newest first
+                try:
+                    trades.append(_loads(payload))
+                except ValueError:
+                    continue
+
+            return trades
             
         except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error getting recent trades: {e}")
+            _LOG_ERR.error(f"Error getting recent trades: {e}")
             return []
     
     @staticmethod
     def get_recent_errors(limit=10):
-        """Get recent error logs"""
+        """
+        Get recent error logs, newest first
+        Always read from the shared errors.log (every process's errors); each call
+        returns freshly parsed dicts
+        """
         try:
+            _writer.flush()
             if not os.path.exists('logs/errors.log'):
                 return []
             
             errors = []
-            with open('logs/errors.log', 'r') as f:
-                lines = f.readlines()
-                for line in lines[-limit:]:
-                    try:
-                        errors.append(json.loads(line.strip()))
-                    except json.JSONDecodeError:
-                        continue
+            for line in _tail_lines('logs/errors.log', limit):
+                try:
+                    errors.append(_loads(line.strip()))
+                except ValueError:
+                    continue
             
             return errors[::-1]  # Reverse to get newest first
             
         except Exception as e:
-            logger = logging.getLogger('trade_logger')
-            logger.error(f"Error getting recent errors: {e}")
+            _LOG_ERR.error(f"Error getting recent errors: {e}")
             return []
\ No newline at end of file
@@ -3,11 +3,15 @@ Machine Learning Integration - Enhancing ML model with original ai.py features
 機械学習統合 - 元のai.pyの機能でMLモデルを強化
 """
 
+import hashlib
+import json
 import logging
+from collections import deque
+from itertools import islice
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import time
 import pickle
 import os
@@ -15,18 +19,60 @@ import os
 # GitHub project ML imports
 from services.ml_model import TradingModel
 from services.technical_indicators import TechnicalIndicators
+from services._backtest_njit import rsi_wilder, score_all, score_parameter_set
 
 # Original ai.py style imports
 import constants
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Weights for probability, signal strength, historical accuracy, volatility
+_CONF_WEIGHTS = np.array([0.3, 0.25, 0.25, 0.2])
+
+# Reuse ML feature importance for the same data within this window (seconds)
+_FEATURE_IMPORTANCE_TTL = 3600
+
+
+def _json_default(obj):
+    """json.dumps fallback for NumPy scalars / arrays"""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class EnhancedMLModel:
     """
     Enhanced Machine Learning Model combining GitHub project ML with ai.py optimization
     統合機械学習モデル - GitHubプロジェクトのMLとai.pyの最適化を統合
     """
     
+    # Parameter sets tried by the optimization backtest (one row per set)
+    _PARAM_KEYS = ('ema_fast', 'ema_slow', 'rsi_period', 'macd_fast', 'macd_slow', 'macd_signal')
+    _PARAM_GRID = np.array([
+        # EMA parameters
+        [12, 26, 14, 12, 26, 9],
+        [10, 21, 14, 10, 21, 9],
+        [8, 21, 14, 8, 21, 9],
+        [15, 30, 14, 15, 30, 9],
+        
+        # RSI variations
+        [12, 26, 10, 12, 26, 9],
+        [12, 26, 18, 12, 26, 9],
+        [12, 26, 21, 12, 26, 9],
+        
+        # MACD variations
+        [12, 26, 14, 8, 21, 6],
+        [12, 26, 14, 15, 30, 12],
+    ], dtype=np.int16)
+    # Longest lookbacks (ema_slow, rsi_period, macd_slow) set the warmup bars skipped by the backtest
+    _WARMUP_COLUMNS = [1, 2, 4]
+    
     def __init__(self):
         """Initialize Enhanced ML Model"""
         # GitHub project ML model
@@ -36,13 +82,20 @@ class EnhancedMLModel:
         # Original ai.py optimization features
         self.optimized_params = None
         self.last_optimization_time = None
+        self._last_optimization_monotonic = None  # interval checks use time.monotonic()
         self.optimization_interval = 24 * 60 * 60  # 24 hours
         self.performance_history = []
         
         # Enhanced features
         self.model_confidence_threshold = 0.6
         self.feature_importance_weights = {}
-        self.prediction_history = []
+        self.prediction_history = deque(maxlen=100)  # Last 100 predictions
+        
+        # Memoized predictions keyed by recent close prices (LRU, 8 entries)
+        self._pred_cache: Dict[bytes, Dict[str, Any]] = {}
+        self._pred_cache_order = deque(maxlen=8)
+        self._signal_columns: Dict[tuple, List[str]] = {}
+        self._fi_cache: Optional[Tuple[tuple, float, Dict[str, float]]] = None  # (fingerprint, time, value)
         
         logger.info('Enhanced ML Model initialized')
 
@@ -59,12 +112,24 @@ class EnhancedMLModel:
             Dict containing prediction, probability, confidence, and optimization info
         """
         try:
+            # One timestamp for the result and its history entry
+            now_iso = datetime.now(timezone.utc).isoformat()
+            
             # Run parameter optimization if needed
             if optimize_params and self._should_optimize_params():
                 logger.info("Running parameter optimization...")
                 self.optimized_params = self.optimize_trading_parameters(df)
                 self._update_optimization_time()
             
+            # Reuse the result when the market data has not changed
+            cache_key = self._prediction_cache_key(df)
+            cached = self._pred_cache.get(cache_key)
+            if cached is not None:
+                self._pred_cache_order.remove(cache_key)
+                self._pred_cache_order.append(cache_key)
+                logger.debug("Enhanced prediction cache hit")
+                return dict(cached, timestamp=now_iso)
+            
             # Get base ML prediction
             base_prediction = self.base_ml_model.predict(df)
             
@@ -83,7 +148,7 @@ class EnhancedMLModel:
             )
             
             # Store prediction history for analysis
-            self._store_prediction_history(enhanced_prediction, confidence)
+            self._store_prediction_history(enhanced_prediction, confidence, now_iso)
             
             result = {
                 'prediction': enhanced_prediction.get('prediction', 0),
@@ -92,19 +157,38 @@ class EnhancedMLModel:
                 'signal_strength': enhanced_prediction.get('signal_strength', 0.5),
                 'optimized_params': self.optimized_params,
                 'feature_importance': enhanced_prediction.get('feature_importance', {}),
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': now_iso
             }
             
             logger.info(f"Enhanced prediction: {result['prediction']}, "
                        f"probability: {result['probability']:.3f}, "
                        f"confidence: {confidence:.3f}")
             
-            return result
+            if len(self._pred_cache_order) == self._pred_cache_order.maxlen:
+                del self._pred_cache[self._pred_cache_order.popleft()]
+            self._pred_cache[cache_key] = result
+            self._pred_cache_order.append(cache_key)
+            
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Enhanced prediction error: {str(e)}")
             return self._fallback_prediction(df)
 
+    def _prediction_cache_key(self, df: pd.DataFrame) -> bytes:
+        """Fingerprint of the last 50 closes, the last feature row, the base model and the optimization run"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(df['close'].tail(50).to_numpy(dtype=np.float64)).tobytes())
+        # Last row of every numeric column (high/low/volume and indicator features, not just close)
+        last_row = df.select_dtypes(include=[np.number]).iloc[-1:]
+        digest.update('\x1f'.join(map(str, last_row.columns)).encode())
+        digest.update(np.ascontiguousarray(last_row.to_numpy(dtype=np.float64, na_value=np.nan)).tobytes())
+        # Bumped by TradingModel.train/optimize_parameters/load_model
+        digest.update(str(self.base_ml_model._model_version).encode())
+        opt_timestamp = self.optimized_params.get('optimization_timestamp') if self.optimized_params else None
+        digest.update(str(opt_timestamp).encode())
+        return digest.digest()
+
     def optimize_trading_parameters(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Optimize trading parameters using combined ML and technical analysis
@@ -146,35 +230,29 @@ class EnhancedMLModel:
         異なるパラメータ組み合わせのバックテストで最適設定を発見
         """
         try:
-            # Define parameter ranges for optimization
-            param_combinations = [
-                # EMA parameters
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 14, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
-                {'ema_fast': 10, 'ema_slow': 21, 'rsi_period': 14, 'macd_fast': 10, 'macd_slow': 21, 'macd_signal': 9},
-                {'ema_fast': 8, 'ema_slow': 21, 'rsi_period': 14, 'macd_fast': 8, 'macd_slow': 21, 'macd_signal': 9},
-                {'ema_fast': 15, 'ema_slow': 30, 'rsi_period': 14, 'macd_fast': 15, 'macd_slow': 30, 'macd_signal': 9},
-                
-                # RSI variations
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 10, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 18, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 21, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
-                
-                # MACD variations
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 14, 'macd_fast': 8, 'macd_slow': 21, 'macd_signal': 6},
-                {'ema_fast': 12, 'ema_slow': 26, 'rsi_period': 14, 'macd_fast': 15, 'macd_slow': 30, 'macd_signal': 12},
-            ]
+            param_grid = self._PARAM_GRID
+            
+            # Indicator series shared by every parameter set
+            close = df['close'].to_numpy(dtype=np.float64)
+            indicator_cache = self._build_indicator_cache(close, param_grid)
+            indicator_sets = [self._add_indicators_with_params(close, self._row_to_dict(row), indicator_cache)
+                              for row in param_grid]
+            
+            # Score all parameter sets in one parallel kernel call
+            scores = score_all(
+                close,
+                *(np.stack([indicators[name] for indicators in indicator_sets])
+                  for name in ('ema_fast', 'ema_slow', 'rsi', 'macd_line', 'macd_signal')),
+                param_grid[:, self._WARMUP_COLUMNS].max(axis=1).astype(np.int64) + 1
+            )
             
-            best_score = -float('inf')
-            best_params = param_combinations[0]
+            if logger.isEnabledFor(logging.DEBUG):
+                for row, score in zip(param_grid, scores):
+                    logger.debug(f"Parameter set {self._row_to_dict(row)} scored: {score:.4f}")
             
-            for params in param_combinations:
-                score = self._evaluate_parameter_set(df, params)
-                
-                if score > best_score:
-                    best_score = score
-                    best_params = params
-                    
-                logger.debug(f"Parameter set {params} scored: {score:.4f}")
+            best_index = int(np.argmax(np.where(np.isnan(scores), -np.inf, scores)))
+            best_score = scores[best_index]
+            best_params = self._row_to_dict(param_grid[best_index])
             
             logger.info(f"Best parameter set scored: {best_score:.4f}")
             return best_params
@@ -183,203 +261,95 @@ class EnhancedMLModel:
             logger.error(f"Backtest error: {str(e)}")
             return self._get_default_params()
 
-    def _evaluate_parameter_set(self, df: pd.DataFrame, params: Dict[str, int]) -> float:
+    def _evaluate_parameter_set(self, df: pd.DataFrame, params: Dict[str, int],
+                                indicator_cache: Optional[Dict[tuple, np.ndarray]] = None) -> float:
         """
         Evaluate a parameter set using backtesting simulation
         バックテストシミュレーションでパラメータセットを評価
         """
         try:
-            # Add indicators with specified parameters
-            df_test = df.copy()
-            
-            # Calculate indicators with test parameters
-            df_test = self._add_indicators_with_params(df_test, params)
-            
-            # Simulate trading with these parameters
-            signals = self._generate_signals_with_params(df_test, params)
-            
-            # Calculate performance metrics
-            returns = self._calculate_strategy_returns(df_test, signals)
-            
-            # Calculate score (profit factor * win rate * total trades)
-            total_return = returns['total_return']
-            win_rate = returns['win_rate']
-            total_trades = returns['total_trades']
-            max_drawdown = returns['max_drawdown']
-            
-            # Scoring function: balance profitability, consistency, and activity
-            score = (
-                total_return * 0.4 +                    # 40% weight on returns
-                win_rate * 0.3 +                        # 30% weight on win rate
-                min(total_trades / 50, 1.0) * 0.2 -     # 20% weight on trade frequency (capped)
-                max_drawdown * 0.1                      # 10% penalty for drawdown
-            )
+            close = df['close'].to_numpy(dtype=np.float64)
+            indicators = self._add_indicators_with_params(close, params, indicator_cache)
             
-            return score
+            return score_parameter_set(
+                close, indicators['ema_fast'], indicators['ema_slow'], indicators['rsi'],
+                indicators['macd_line'], indicators['macd_signal'],
+                max(params['ema_slow'], params['macd_slow'], params['rsi_period']) + 1
+            )
             
         except Exception as e:
             logger.error(f"Parameter evaluation error: {str(e)}")
             return -1.0
 
-    def _add_indicators_with_params(self, df: pd.DataFrame, params: Dict[str, int]) -> pd.DataFrame:
-        """Add technical indicators with specified parameters"""
-        try:
-            df_with_indicators = df.copy()
-            
-            # Add EMA indicators
-            df_with_indicators[f"ema_{params['ema_fast']}"] = df_with_indicators['close'].ewm(span=params['ema_fast']).mean()
-            df_with_indicators[f"ema_{params['ema_slow']}"] = df_with_indicators['close'].ewm(span=params['ema_slow']).mean()
-            
-            # Add RSI
-            delta = df_with_indicators['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=params['rsi_period']).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=params['rsi_period']).mean()
-            rs = gain / loss
-            df_with_indicators[f"rsi_{params['rsi_period']}"] = 100 - (100 / (1 + rs))
-            
-            # Add MACD
-            ema_fast = df_with_indicators['close'].ewm(span=params['macd_fast']).mean()
-            ema_slow = df_with_indicators['close'].ewm(span=params['macd_slow']).mean()
-            df_with_indicators['macd_line'] = ema_fast - ema_slow
-            df_with_indicators['macd_signal'] = df_with_indicators['macd_line'].ewm(span=params['macd_signal']).mean()
-            df_with_indicators['macd_histogram'] = df_with_indicators['macd_line'] - df_with_indicators['macd_signal']
-            
-            return df_with_indicators
-            
-        except Exception as e:
-            logger.error(f"Indicator calculation error: {str(e)}")
-            return df
+    @classmethod
+    def _row_to_dict(cls, row: np.ndarray) -> Dict[str, int]:
+        """Convert a _PARAM_GRID row to a parameter dict"""
+        return dict(zip(cls._PARAM_KEYS, row.tolist()))
 
-    def _generate_signals_with_params(self, df: pd.DataFrame, params: Dict[str, int]) -> List[int]:
-        """Generate trading signals using specified parameters"""
-        try:
-            signals = []
-            
-            for i in range(len(df)):
-                if i < max(params.values()) + 1:  # Skip initial rows without enough data
-                    signals.append(0)  # Hold
-                    continue
-                
-                signal = 0  # Default to hold
-                signal_score = 0
-                
-                # EMA crossover signals
-                ema_fast_current = df.iloc[i][f"ema_{params['ema_fast']}"]
-                ema_slow_current = df.iloc[i][f"ema_{params['ema_slow']}"]
-                ema_fast_prev = df.iloc[i-1][f"ema_{params['ema_fast']}"]
-                ema_slow_prev = df.iloc[i-1][f"ema_{params['ema_slow']}"]
-                
-                if ema_fast_prev < ema_slow_prev and ema_fast_current > ema_slow_current:
-                    signal_score += 1  # Golden cross
-                elif ema_fast_prev > ema_slow_prev and ema_fast_current < ema_slow_current:
-                    signal_score -= 1  # Death cross
-                
-                # RSI signals
-                rsi_current = df.iloc[i][f"rsi_{params['rsi_period']}"]
-                rsi_prev = df.iloc[i-1][f"rsi_{params['rsi_period']}"]
-                
-                if rsi_prev < 30 and rsi_current >= 30:
-                    signal_score += 1  # Recovery from oversold
-                elif rsi_prev > 70 and rsi_current <= 70:
-                    signal_score -= 1  # Fall from overbought
-                
-                # MACD signals
-                macd_current = df.iloc[i]['macd_line']
-                macd_signal_current = df.iloc[i]['macd_signal']
-                macd_prev = df.iloc[i-1]['macd_line']
-                macd_signal_prev = df.iloc[i-1]['macd_signal']
-                
-                if macd_prev < macd_signal_prev and macd_current > macd_signal_current:
-                    signal_score += 1  # MACD bullish crossover
-                elif macd_prev > macd_signal_prev and macd_current < macd_signal_current:
-                    signal_score -= 1  # MACD bearish crossover
-                
-                # Convert score to signal
-                if signal_score >= 2:
-                    signal = 1  # Buy
-                elif signal_score <= -2:
-                    signal = -1  # Sell
-                else:
-                    signal = 0  # Hold
-                
-                signals.append(signal)
-            
-            return signals
-            
-        except Exception as e:
-            logger.error(f"Signal generation error: {str(e)}")
-            return [0] * len(df)
+    def _build_indicator_cache(self, close: np.ndarray, param_grid: np.ndarray) -> Dict[tuple, np.ndarray]:
+        """
+        Compute each distinct EMA / RSI / MACD series once for a set of parameter combinations
+        パラメータ組み合わせ全体で共通する指標系列を一度だけ計算
+        """
+        cache = {}
+        close_series = pd.Series(close)
+        param_rows = param_grid.tolist()
+        
+        # EMA spans (EMA crossover and both MACD legs)
+        ema_spans = set()
+        for ema_fast, ema_slow, _, macd_fast, macd_slow, _ in param_rows:
+            ema_spans.update((ema_fast, ema_slow, macd_fast, macd_slow))
+        for span in ema_spans:
+            cache[('ema', span)] = close_series.ewm(span=span).mean().to_numpy(dtype=np.float64)
+        
+        # RSI periods (Wilder smoothing)
+        for period in {row[2] for row in param_rows}:
+            cache[('rsi', period)] = rsi_wilder(close, period)
+        
+        # MACD line / signal
+        for _, _, _, macd_fast, macd_slow, macd_signal in param_rows:
+            macd_key = (macd_fast, macd_slow)
+            if ('macd_line',) + macd_key not in cache:
+                cache[('macd_line',) + macd_key] = cache[('ema', macd_fast)] - cache[('ema', macd_slow)]
+            signal_key = ('macd_signal',) + macd_key + (macd_signal,)
+            if signal_key not in cache:
+                macd_line = pd.Series(cache[('macd_line',) + macd_key])
+                cache[signal_key] = macd_line.ewm(span=macd_signal).mean().to_numpy(dtype=np.float64)
+        
+        cache[('close',)] = close
+        return cache
 
-    def _calculate_strategy_returns(self, df: pd.DataFrame, signals: List[int]) -> Dict[str, float]:
-        """Calculate strategy performance metrics"""
-        try:
-            trades = []
-            position = 0
-            entry_price = 0
-            
-            for i in range(len(signals)):
-                signal = signals[i]
-                price = df.iloc[i]['close']
-                
-                if signal == 1 and position == 0:  # Buy signal, no position
-                    position = 1
-                    entry_price = price
-                elif signal == -1 and position == 1:  # Sell signal, have position
-                    exit_price = price
-                    returns = (exit_price - entry_price) / entry_price
-                    trades.append(returns)
-                    position = 0
-                    entry_price = 0
-                elif signal == -1 and position == 0:  # Sell signal, no position
-                    position = -1
-                    entry_price = price
-                elif signal == 1 and position == -1:  # Buy signal, have short position
-                    exit_price = price
-                    returns = (entry_price - exit_price) / entry_price
-                    trades.append(returns)
-                    position = 0
-                    entry_price = 0
-            
-            if not trades:
-                return {
-                    'total_return': 0,
-                    'win_rate': 0,
-                    'total_trades': 0,
-                    'max_drawdown': 0
-                }
-            
-            # Calculate metrics
-            total_return = sum(trades)
-            winning_trades = [t for t in trades if t > 0]
-            win_rate = len(winning_trades) / len(trades) if trades else 0
-            
-            # Calculate max drawdown
-            cumulative_returns = np.cumsum(trades)
-            max_drawdown = np.max(np.maximum.accumulate(cumulative_returns) - cumulative_returns)
-            
-            return {
-                'total_return': total_return,
-                'win_rate': win_rate,
-                'total_trades': len(trades),
-                'max_drawdown': max_drawdown
-            }
-            
-        except Exception as e:
-            logger.error(f"Returns calculation error: {str(e)}")
-            return {
-                'total_return': 0,
-                'win_rate': 0,
-                'total_trades': 0,
-                'max_drawdown': 0
-            }
+    def _add_indicators_with_params(self, close: np.ndarray, params: Dict[str, int],
+                                    indicator_cache: Optional[Dict[tuple, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Collect the indicator arrays for a parameter set (no DataFrame copy)"""
+        if indicator_cache is None:
+            param_row = np.array([[params[key] for key in self._PARAM_KEYS]], dtype=np.int16)
+            indicator_cache = self._build_indicator_cache(close, param_row)
+        
+        macd_key = (params['macd_fast'], params['macd_slow'])
+        return {
+            'close': indicator_cache[('close',)],
+            'ema_fast': indicator_cache[('ema', params['ema_fast'])],
+            'ema_slow': indicator_cache[('ema', params['ema_slow'])],
+            'rsi': indicator_cache[('rsi', params['rsi_period'])],
+            'macd_line': indicator_cache[('macd_line',) + macd_key],
+            'macd_signal': indicator_cache[('macd_signal',) + macd_key + (params['macd_signal'],)],
+        }
 
     def _get_ml_feature_importance(self, df: pd.DataFrame) -> Dict[str, float]:
         """Get feature importance from ML model"""
         try:
+            fingerprint = (len(df), float(df['close'].iat[-1]), float(df['close'].iat[0]))
+            if (self._fi_cache and self._fi_cache[0] == fingerprint
+                    and time.time() - self._fi_cache[1] < _FEATURE_IMPORTANCE_TTL):
+                logger.debug("Using cached ML feature importance")
+                return self._fi_cache[2]
+            
             # Use GitHub project's ML model to get feature importance
             ml_result = self.base_ml_model.optimize_parameters(df)
             
             if ml_result and 'top_features' in ml_result:
+                self._fi_cache = (fingerprint, time.time(), ml_result['top_features'])
                 return ml_result['top_features']
             else:
                 return {}
@@ -470,36 +440,31 @@ class EnhancedMLModel:
             if len(df) < 2:
                 return 0.5
             
-            signal_score = 0
             max_signals = 3  # EMA, RSI, MACD
             
+            params_key = tuple(params.values())
+            columns = self._signal_columns.get(params_key)
+            if columns is None:
+                columns = [f"ema_{params['ema_fast']}", f"ema_{params['ema_slow']}", f"rsi_{params['rsi_period']}",
+                           'macd_line', 'macd_signal']
+                self._signal_columns[params_key] = columns
+            
+            # Positional column indices (-1 when the column is missing)
+            ema_fast_idx, ema_slow_idx, rsi_idx, macd_line_idx, macd_signal_idx = df.columns.get_indexer(columns)
+            signal_score = 0
+            
             # EMA signal
-            if f"ema_{params['ema_fast']}" in df.columns and f"ema_{params['ema_slow']}" in df.columns:
-                ema_fast_current = df.iloc[-1][f"ema_{params['ema_fast']}"]
-                ema_slow_current = df.iloc[-1][f"ema_{params['ema_slow']}"]
-                
-                if ema_fast_current > ema_slow_current:
-                    signal_score += 1
-                else:
-                    signal_score -= 1
+            if ema_fast_idx >= 0 and ema_slow_idx >= 0:
+                signal_score += 1 if df.iat[-1, ema_fast_idx] > df.iat[-1, ema_slow_idx] else -1
             
             # RSI signal
-            if f"rsi_{params['rsi_period']}" in df.columns:
-                rsi = df.iloc[-1][f"rsi_{params['rsi_period']}"]
-                if rsi < 30:
-                    signal_score += 1
-                elif rsi > 70:
-                    signal_score -= 1
+            if rsi_idx >= 0:
+                rsi = df.iat[-1, rsi_idx]
+                signal_score += 1 if rsi < 30 else -1 if rsi > 70 else 0
             
             # MACD signal
-            if 'macd_line' in df.columns and 'macd_signal' in df.columns:
-                macd_line = df.iloc[-1]['macd_line']
-                macd_signal = df.iloc[-1]['macd_signal']
-                
-                if macd_line > macd_signal:
-                    signal_score += 1
-                else:
-                    signal_score -= 1
+            if macd_line_idx >= 0 and macd_signal_idx >= 0:
+                signal_score += 1 if df.iat[-1, macd_line_idx] > df.iat[-1, macd_signal_idx] else -1
             
             # Normalize to 0-1 scale
             normalized_signal = (signal_score + max_signals) / (2 * max_signals)
@@ -512,30 +477,23 @@ class EnhancedMLModel:
     def _calculate_prediction_confidence(self, prediction: Dict, df: pd.DataFrame) -> float:
         """Calculate confidence score for the prediction"""
         try:
-            confidence_factors = []
-            
             # Factor 1: Prediction probability distance from 0.5
             prob = prediction.get('probability', 0.5)
             prob_confidence = abs(prob - 0.5) * 2
-            confidence_factors.append(prob_confidence)
             
             # Factor 2: Signal strength consistency
             signal_strength = prediction.get('signal_strength', 0.5)
-            confidence_factors.append(signal_strength)
             
             # Factor 3: Historical accuracy (if available)
             historical_accuracy = self._get_historical_accuracy()
-            confidence_factors.append(historical_accuracy)
             
             # Factor 4: Market volatility adjustment
             volatility_adjustment = self._get_volatility_adjustment(df)
-            confidence_factors.append(volatility_adjustment)
             
             # Calculate weighted average confidence
-            weights = [0.3, 0.25, 0.25, 0.2]  # Adjust weights as needed
-            confidence = sum(f * w for f, w in zip(confidence_factors, weights))
-            
-            return max(0.0, min(1.0, confidence))
+            confidence_factors = np.array([prob_confidence, signal_strength,
+                                           historical_accuracy, volatility_adjustment])
+            return float(np.clip(confidence_factors @ _CONF_WEIGHTS, 0.0, 1.0))
             
         except Exception as e:
             logger.error(f"Confidence calculation error: {str(e)}")
@@ -548,7 +506,7 @@ class EnhancedMLModel:
                 return 0.5  # Default confidence
             
             # Calculate accuracy of recent predictions
-            recent_predictions = self.prediction_history[-20:]  # Last 20 predictions
+            recent_predictions = list(islice(self.prediction_history, max(0, len(self.prediction_history) - 20), None))  # Last 20 predictions
             correct_predictions = sum(1 for pred in recent_predictions if pred.get('correct', False))
             accuracy = correct_predictions / len(recent_predictions)
             
@@ -565,9 +523,11 @@ class EnhancedMLModel:
                 return 0.5
             
             # Calculate recent price volatility
-            recent_prices = df['close'].tail(20)
-            returns = recent_prices.pct_change().dropna()
-            volatility = returns.std()
+            recent_prices = df['close'].to_numpy(dtype=np.float64)[-20:]
+            previous_prices = recent_prices[:-1]
+            returns = np.divide(np.diff(recent_prices), previous_prices,
+                                out=np.zeros(len(previous_prices)), where=previous_prices != 0)
+            volatility = returns.std(ddof=1)
             
             # Higher volatility reduces confidence
             # Normalize volatility (assuming typical crypto volatility 0.01-0.1)
@@ -580,11 +540,11 @@ class EnhancedMLModel:
             logger.error(f"Volatility adjustment error: {str(e)}")
             return 0.5
 
-    def _store_prediction_history(self, prediction: Dict, confidence: float):
+    def _store_prediction_history(self, prediction: Dict, confidence: float, timestamp: Optional[str] = None):
         """Store prediction in history for accuracy tracking"""
         try:
             history_entry = {
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': timestamp or datetime.now(timezone.utc).isoformat(),
                 'prediction': prediction.get('prediction', 0),
                 'probability': prediction.get('probability', 0.5),
                 'confidence': confidence,
@@ -592,10 +552,6 @@ class EnhancedMLModel:
             }
             
             self.prediction_history.append(history_entry)
-            
-            # Keep only recent history (last 100 predictions)
-            if len(self.prediction_history) > 100:
-                self.prediction_history = self.prediction_history[-100:]
                 
         except Exception as e:
             logger.error(f"History storage error: {str(e)}")
@@ -605,15 +561,18 @@ class EnhancedMLModel:
         if not self.optimized_params:
             return True
             
-        if self.last_optimization_time:
-            elapsed = time.time() - self.last_optimization_time
-            return elapsed >= self.optimization_interval
+        if self._last_optimization_monotonic is None:
+            # Parameters restored without a timestamp: treat them as fresh
+            self._update_optimization_time()
+            return False
             
-        return True
+        elapsed = time.monotonic() - self._last_optimization_monotonic
+        return elapsed >= self.optimization_interval
 
     def _update_optimization_time(self):
         """Update last optimization timestamp"""
-        self.last_optimization_time = time.time()
+        self.last_optimization_time = time.time()  # wall clock, persisted with the state
+        self._last_optimization_monotonic = time.monotonic()
 
     def _get_default_params(self) -> Dict[str, Any]:
         """Get default optimization parameters"""
@@ -679,28 +638,49 @@ class EnhancedMLModel:
                 'error': str(e)
             }
 
+    def _get_model_state(self) -> Dict[str, Any]:
+        """Collect the persistent enhanced ML state"""
+        return {
+            'optimized_params': self.optimized_params,
+            'last_optimization_time': self.last_optimization_time,
+            'performance_history': self.performance_history,
+            'prediction_history': list(self.prediction_history),
+            'feature_importance_weights': self.feature_importance_weights,
+            'model_confidence_threshold': self.model_confidence_threshold
+        }
+
     def save_model_state(self, filepath: str = 'models/enhanced_ml_state.pkl'):
         """Save enhanced ML model state"""
         try:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
             
-            state = {
-                'optimized_params': self.optimized_params,
-                'last_optimization_time': self.last_optimization_time,
-                'performance_history': self.performance_history,
-                'prediction_history': self.prediction_history,
-                'feature_importance_weights': self.feature_importance_weights,
-                'model_confidence_threshold': self.model_confidence_threshold
-            }
-            
             with open(filepath, 'wb') as f:
-                pickle.dump(state, f)
+                pickle.dump(self._get_model_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
                 
             logger.info(f"Enhanced ML model state saved to {filepath}")
             
         except Exception as e:
             logger.error(f"Model save error: {str(e)}")
 
+    def save_model_state_json(self, filepath: str = 'models/enhanced_ml_state.json'):
+        """Save enhanced ML model state as JSON (readable without pickle)"""
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            state = self._get_model_state()
+            
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+            else:
+                payload = json.dumps(state, default=_json_default).encode('utf-8')
+            
+            with open(filepath, 'wb') as f:
+                f.write(payload)
+                
+            logger.info(f"Enhanced ML model state saved to {filepath}")
+            
+        except Exception as e:
+            logger.error(f"Model JSON save error: {str(e)}")
+
     def load_model_state(self, filepath: str = 'models/enhanced_ml_state.pkl'):
         """Load enhanced ML model state"""
         try:
@@ -713,8 +693,13 @@ class EnhancedMLModel:
             
             self.optimized_params = state.get('optimized_params')
             self.last_optimization_time = state.get('last_optimization_time')
+            if self.last_optimization_time:
+                elapsed = max(0.0, time.time() - self.last_optimization_time)
+                self._last_optimization_monotonic = time.monotonic() - elapsed
+            else:
+                self._last_optimization_monotonic = None
             self.performance_history = state.get('performance_history', [])
-            self.prediction_history = state.get('prediction_history', [])
+            self.prediction_history = deque(state.get('prediction_history', []), maxlen=100)
             self.feature_importance_weights = state.get('feature_importance_weights', {})
             self.model_confidence_threshold = state.get('model_confidence_threshold', 0.6)
             
@@ -2,14 +2,17 @@ import pandas as pd
 import numpy as np
 import logging
 import os
+from collections import deque
+
+from services._feature_njit import NUMBA_AVAILABLE, fill_nan_columns
 
 # Temporary fallback without sklearn - use simple logic instead
 try:
-    from sklearn.ensemble import RandomForestClassifier
-    from sklearn.model_selection import train_test_split, GridSearchCV
-    from sklearn.preprocessing import StandardScaler
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.model_selection import train_test_split, RandomizedSearchCV
     from sklearn.metrics import accuracy_score, classification_report
     import joblib
+    from scipy.stats import loguniform, randint, uniform
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
@@ -24,18 +27,27 @@ class TradingModel:
     
     def __init__(self):
         if SKLEARN_AVAILABLE:
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=5,
-                min_samples_leaf=2,
+            # Histogram-based gradient boosting: binned splits, boosting rounds chosen by early stopping
+            self.model = HistGradientBoostingClassifier(
+                max_iter=200,
+                max_depth=8,
+                learning_rate=0.05,
+                early_stopping=True,
                 random_state=42
             )
-            self.scaler = StandardScaler()
         else:
             self.model = None
-            self.scaler = None
-            
+        
+        # Trees are invariant to feature scaling, so features go to the model unscaled;
+        # a scaler is only loaded for a legacy model that was trained on scaled features
+        self.scaler = None
+            
+        # Last predictions keyed by (model version, feature row bytes); the version is bumped
+        # whenever the model is fitted or replaced, which invalidates older entries
+        self._model_version = 0
+        self._pred_cache = {}
+        self._pred_cache_order = deque(maxlen=8)
+        
         self.is_trained = False
         self.feature_columns = []
         self.model_path = 'models/trading_model.pkl'
@@ -47,10 +59,8 @@ class TradingModel:
     def prepare_features(self, df):
         """Prepare features for ML model"""
         try:
-            feature_df = df.copy()
-            
             # Remove non-numeric columns and NaN values
-            numeric_columns = feature_df.select_dtypes(include=[np.number]).columns.tolist()
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
             
             # Exclude target-related columns if they exist
             exclude_columns = ['open', 'high', 'low', 'volume', 'timestamp']
@@ -60,11 +70,19 @@ class TradingModel:
                 logger.warning("No suitable feature columns found")
                 return None, []
             
-            # Fill NaN values with forward fill, then backward fill
-            feature_df[feature_columns] = feature_df[feature_columns].ffill().bfill()
-            
-            # Drop rows that still have NaN values
-            feature_df = feature_df[feature_columns].dropna()
+            if NUMBA_AVAILABLE:
+                # ffill -> bfill -> dropna fused into one pass over a single float64 copy;
+                # after both fills NaN can only remain if a column is empty, which drops every row
+                values = df[feature_columns].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+                if not fill_nan_columns(values):
+                    values = values[:0]
+                feature_df = pd.DataFrame(values, index=df.index[:len(values)], columns=feature_columns)
+            else:
+                # Fill NaN values with forward fill, then backward fill (only the feature columns are copied)
+                feature_df = df[feature_columns].ffill().bfill()
+                
+                # Drop rows that still have NaN values
+                feature_df = feature_df.dropna()
             
             if feature_df.empty:
                 logger.warning("No data available after cleaning")
@@ -79,17 +97,24 @@ class TradingModel:
             logger.error(f"Error preparing features: {e}")
             return None, []
     
+    def prepare_features_predict(self, df, window=50):
+        """Last feature row for prediction using the known feature columns (None -> use prepare_features)"""
+        if not self.feature_columns or not set(self.feature_columns).issubset(df.columns):
+            return None
+        
+        X = df[self.feature_columns].tail(window).ffill().bfill().iloc[[-1]]
+        if X.isna().to_numpy().any():
+            return None  # no recent value for some column, fall back to the full history
+        return X
+    
     def create_target(self, df, lookahead=1):
         """Create target variable (1 if price goes up, 0 if down)"""
         try:
-            df = df.copy()
-            df['future_price'] = df['close'].shift(-lookahead)
-            df['target'] = (df['future_price'] > df['close']).astype(int)
+            close = df['close']
+            target = (close.shift(-lookahead) > close).astype(int).rename('target')
             
             # Remove rows where we can't predict
-            df = df[:-lookahead]
-            
-            return df['target']
+            return target.iloc[:-lookahead]
             
         except Exception as e:
             logger.error(f"Error creating target: {e}")
@@ -131,16 +156,17 @@ class TradingModel:
                 X, y, test_size=0.2, random_state=42, stratify=y
             )
             
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            X_train = X_train.to_numpy(dtype=np.float64)
+            X_test = X_test.to_numpy(dtype=np.float64)
             
             # Train model
-            self.model.fit(X_train_scaled, y_train)
+            self.model.fit(X_train, y_train)
+            self.scaler = None
+            self._model_version += 1
             
             # Evaluate
-            train_score = self.model.score(X_train_scaled, y_train)
-            test_score = self.model.score(X_test_scaled, y_test)
+            train_score = self.model.score(X_train, y_train)
+            test_score = self.model.score(X_test, y_test)
             
             logger.info(f"Model trained successfully - Train score: {train_score:.4f}, Test score: {test_score:.4f}")
             
@@ -179,40 +205,100 @@ class TradingModel:
                     logger.warning("Model not trained and cannot be loaded, using fallback")
                     return None
             
-            # Prepare features
-            feature_data, _ = self.prepare_features(df)
-            if feature_data is None:
+            X = self._last_feature_row(df)
+            if X is None:
                 return None
             
-            # Use only the last row for prediction
-            X = feature_data.iloc[[-1]]
+            # Same feature row on the same model (e.g. polling faster than candles close) -> reuse
+            cache_key = (self._model_version, X.to_numpy(dtype=np.float64).tobytes())
+            cached = self._pred_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, features=dict(cached['features']))
             
-            # Make sure we have the same features as training
-            if self.feature_columns:
-                missing_cols = [col for col in self.feature_columns if col not in X.columns]
-                if missing_cols:
-                    logger.warning(f"Missing feature columns: {missing_cols}")
-                    return None
-                
-                X = X[self.feature_columns]
-            
-            # Scale features
-            X_scaled = self.scaler.transform(X)
-            
-            # Make prediction
-            prediction = self.model.predict(X_scaled)[0]
-            probability = self.model.predict_proba(X_scaled)[0]
+            # Make prediction (class taken from the probabilities, as the classifier's predict does)
+            probability = self.model.predict_proba(self._model_input(X))[0]
+            prediction = self.model.classes_[probability.argmax()]
             
-            return {
+            result = {
                 'prediction': prediction,
                 'probability': probability[1],  # Probability of price going up
                 'features': X.iloc[0].to_dict()
             }
             
+            if len(self._pred_cache_order) == self._pred_cache_order.maxlen:
+                del self._pred_cache[self._pred_cache_order.popleft()]
+            self._pred_cache[cache_key] = result
+            self._pred_cache_order.append(cache_key)
+            
+            return dict(result, features=dict(result['features']))
+            
         except Exception as e:
             logger.error(f"Error making prediction: {e}")
             return None
     
+    def predict_batch(self, dfs):
+        """Predict the last bar of several DataFrames with one predict_proba call"""
+        try:
+            if not SKLEARN_AVAILABLE:
+                return [self.predict(df) for df in dfs]
+            
+            if not self.is_trained:
+                if not self.load_model():
+                    logger.warning("Model not trained and cannot be loaded, using fallback")
+                    return [None] * len(dfs)
+            
+            rows = [self._last_feature_row(df) for df in dfs]
+            valid = [i for i, row in enumerate(rows) if row is not None]
+            results = [None] * len(dfs)
+            if not valid:
+                return results
+            
+            X = pd.concat([rows[i] for i in valid])
+            probabilities = self.model.predict_proba(self._model_input(X))
+            predictions = self.model.classes_[probabilities.argmax(axis=1)]
+            
+            for k, i in enumerate(valid):
+                results[i] = {
+                    'prediction': predictions[k],
+                    'probability': probabilities[k, 1],  # Probability of price going up
+                    'features': rows[i].iloc[0].to_dict()
+                }
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error making batch prediction: {e}")
+            return [None] * len(dfs)
+    
+    def _last_feature_row(self, df):
+        """Single-row feature DataFrame for the last bar (None if features cannot be built)"""
+        # Fast path: only the last row is needed once the feature columns are known
+        X = self.prepare_features_predict(df)
+        if X is None:
+            # Prepare features
+            feature_data, _ = self.prepare_features(df)
+            if feature_data is None:
+                return None
+            
+            # Use only the last row for prediction
+            X = feature_data.iloc[[-1]]
+        
+        # Make sure we have the same features as training
+        if self.feature_columns:
+            missing_cols = [col for col in self.feature_columns if col not in X.columns]
+            if missing_cols:
+                logger.warning(f"Missing feature columns: {missing_cols}")
+                return None
+            
+            X = X[self.feature_columns]
+        
+        return X
+    
+    def _model_input(self, X):
+        """Feature array for the model (scaled only for a legacy scaled-feature model)"""
+        if self.scaler is not None:
+            return self.scaler.transform(X)
+        return X.to_numpy(dtype=np.float64)
+    
     def optimize_parameters(self, df):
         """Optimize model parameters"""
         try:
@@ -235,40 +321,42 @@ class TradingModel:
                 logger.warning("Not enough data for parameter optimization")
                 return None
             
-            # Scale features
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Parameter grid
-            param_grid = {
-                'n_estimators': [50, 100, 200],
-                'max_depth': [5, 10, 15],
-                'min_samples_split': [2, 5, 10],
-                'min_samples_leaf': [1, 2, 4]
+            # Parameter distributions (boosting rounds are picked by early stopping)
+            param_distributions = {
+                'learning_rate': loguniform(0.01, 0.3),
+                'max_leaf_nodes': randint(8, 64),
+                'l2_regularization': uniform(0.0, 1.0)
             }
             
-            # Grid search
-            grid_search = GridSearchCV(
-                RandomForestClassifier(random_state=42),
-                param_grid,
+            # Randomized search (20 sampled combinations instead of the full grid)
+            search = RandomizedSearchCV(
+                HistGradientBoostingClassifier(max_iter=200, max_depth=8, early_stopping=True, random_state=42),
+                param_distributions,
+                n_iter=20,
                 cv=3,
                 scoring='accuracy',
-                n_jobs=-1
+                n_jobs=-1,
+                random_state=42
             )
             
-            grid_search.fit(X_scaled, y)
+            search.fit(X.to_numpy(dtype=np.float64), y)
             
             # Update model with best parameters
-            self.model = grid_search.best_estimator_
+            self.model = search.best_estimator_
+            self.scaler = None
+            self._model_version += 1
             self.is_trained = True
+            best_score = search.best_score_
+            best_params = dict(search.best_params_, max_iter=self.model.n_iter_)
             
             # Save optimized model
             self.save_model()
             
-            logger.info(f"Parameter optimization complete. Best score: {grid_search.best_score_:.4f}")
+            logger.info(f"Parameter optimization complete. Best score: {best_score:.4f}")
             
             return {
-                'best_score': grid_search.best_score_,
-                'model_params': grid_search.best_params_,
+                'best_score': best_score,
+                'model_params': best_params,
                 'top_features': feature_cols[:10]  # Top 10 features
             }
             
@@ -280,7 +368,8 @@ class TradingModel:
         """Save trained model"""
         try:
             joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
+            if os.path.exists(self.scaler_path):
+                os.remove(self.scaler_path)  # legacy scaler does not belong to this model
             logger.info("Model saved successfully")
             return True
         except Exception as e:
@@ -290,9 +379,13 @@ class TradingModel:
     def load_model(self):
         """Load trained model"""
         try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                self.model = joblib.load(self.model_path)
-                self.scaler = joblib.load(self.scaler_path)
+            if os.path.exists(self.model_path):
+                # Memory-map the NumPy arrays (files are saved uncompressed) instead of copying them onto the heap
+                self.model = joblib.load(self.model_path, mmap_mode='r')
+                self.scaler = None
+                if os.path.exists(self.scaler_path):
+                    self.scaler = joblib.load(self.scaler_path, mmap_mode='r')
+                self._model_version += 1
                 self.is_trained = True
                 logger.info("Model loaded successfully")
                 return True
@@ -1,7 +1,16 @@
 import logging
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 import json
 import os
+import threading
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +20,60 @@ class NotificationService:
     """
     
     def __init__(self):
-        self.alerts_file = 'logs/alerts.json'
+        self.alerts_file = 'logs/alerts.ndjson'  # one JSON alert per line, oldest first
+        self.legacy_alerts_file = 'logs/alerts.json'  # pre-NDJSON list, newest first
         self.max_alerts = 50
         
         # Create alerts directory if it doesn't exist
         os.makedirs('logs', exist_ok=True)
+        
+        # In-memory recent alerts (newest on the right); the file is append-only
+        self._lock = threading.Lock()
+        self._alerts = deque(maxlen=self.max_alerts)
+        self._file_lines = 0
+        self._lock_file = None  # .lock handle, opened on first use and kept for the process lifetime
+        self._read_alerts_file()
+    
+    def _read_alerts_file(self):
+        """Load the most recent alerts into memory, migrating the legacy alerts.json once"""
+        try:
+            with self._file_lock():
+                if not os.path.exists(self.alerts_file) and os.path.exists(self.legacy_alerts_file):
+                    self._migrate_legacy_file()
+                self._load_alert_lines()
+        except Exception as e:
+            logger.error(f"Error loading alerts: {e}")
+    
+    def _migrate_legacy_file(self):
+        """Rewrite the legacy JSON list as NDJSON and keep the original as .migrated (caller holds the file lock)"""
+        try:
+            with open(self.legacy_alerts_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            if not isinstance(legacy, list):
+                raise ValueError("expected a list of alerts")
+            self._alerts.extend(reversed(legacy[:self.max_alerts]))
+            self._replace_alerts_file()
+            self._alerts.clear()
+            os.replace(self.legacy_alerts_file, self.legacy_alerts_file + '.migrated')
+            logger.info(f"Migrated {len(legacy[:self.max_alerts])} alerts from {self.legacy_alerts_file}")
+        except Exception as e:
+            logger.error(f"Error migrating {self.legacy_alerts_file}: {e}")
+    
+    def _load_alert_lines(self):
+        """Replace the in-memory alerts with the tail of the NDJSON file (caller holds the file lock)"""
+        self._alerts.clear()
+        self._file_lines = 0
+        if not os.path.exists(self.alerts_file):
+            return
+        with open(self.alerts_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._file_lines += 1
+                line = line.strip()
+                if line:
+                    try:
+                        self._alerts.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipping malformed alert line in {self.alerts_file}")
     
     def send_alert(self, alert_type, message, price=None, symbol=None):
         """
@@ -35,17 +93,18 @@ class NotificationService:
                 'symbol': symbol
             }
             
-            # Load existing alerts
-            alerts = self.load_alerts()
-            
-            # Add new alert at beginning
-            alerts.insert(0, alert)
-            
-            # Keep only recent alerts
-            alerts = alerts[:self.max_alerts]
-            
-            # Save alerts
-            self.save_alerts(alerts)
+            with self._lock, self._file_lock():
+                # Append a single line; compact once the file holds twice the retained alerts
+                if self._file_lines >= 2 * self.max_alerts:
+                    # Re-read under the file lock so lines other processes appended survive
+                    self._load_alert_lines()
+                    self._alerts.append(alert)
+                    self._replace_alerts_file()
+                else:
+                    with open(self.alerts_file, 'a', encoding='utf-8') as f:
+                        f.write(self._dumps(alert))
+                    self._file_lines += 1
+                    self._alerts.append(alert)
             
             # Log the alert
             logger.info(f"Alert sent: {alert_type} - {message}")
@@ -57,31 +116,60 @@ class NotificationService:
             return False
     
     def load_alerts(self):
-        """Load alerts from file"""
-        try:
-            if os.path.exists(self.alerts_file):
-                with open(self.alerts_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
-        except Exception as e:
-            logger.error(f"Error loading alerts: {e}")
-            return []
+        """Load alerts (newest first)"""
+        with self._lock:
+            return list(reversed(self._alerts))
     
     def save_alerts(self, alerts):
-        """Save alerts to file"""
+        """Replace stored alerts (newest first) and rewrite the file"""
         try:
-            with open(self.alerts_file, 'w', encoding='utf-8') as f:
-                json.dump(alerts, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                self._alerts = deque(reversed(alerts[:self.max_alerts]), maxlen=self.max_alerts)
+                self._write_alerts_file()
             return True
         except Exception as e:
             logger.error(f"Error saving alerts: {e}")
             return False
     
+    def _write_alerts_file(self):
+        """Atomically rewrite the NDJSON file from the in-memory alerts (caller holds the lock)"""
+        with self._file_lock():
+            self._replace_alerts_file()
+    
+    def _replace_alerts_file(self):
+        """Write the in-memory alerts to a temp file and swap it in (caller holds the file lock)"""
+        tmp_file = self.alerts_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(self._dumps(alert) for alert in self._alerts)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.alerts_file)
+        self._file_lines = len(self._alerts)
+    
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes writing the alerts file (caller holds the lock)"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        # The lock file is never replaced, so one handle serves every alert
+        if self._lock_file is None:
+            self._lock_file = open(self.alerts_file + '.lock', 'a')
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _dumps(alert):
+        """Serialize one alert as a compact NDJSON line"""
+        return json.dumps(alert, ensure_ascii=False, separators=(',', ':')) + '\n'
+    
     def get_recent_alerts(self, limit=10):
         """Get recent alerts"""
         try:
-            alerts = self.load_alerts()
-            return alerts[:limit]
+            return self.load_alerts()[:limit]
         except Exception as e:
             logger.error(f"Error getting recent alerts: {e}")
             return []
@@ -89,8 +177,7 @@ class NotificationService:
     def clear_alerts(self):
         """Clear all alerts"""
         try:
-            self.save_alerts([])
-            return True
+            return self.save_alerts([])
         except Exception as e:
             logger.error(f"Error clearing alerts: {e}")
             return False
@@ -113,4 +200,4 @@ class NotificationService:
     
     def alert_system_status(self, status):
         """Alert for system status change"""
-        self.send_alert('info', f"システム状態: {status}")
\ No newline at end of file
+        self.send_alert('info', f"システム状態: {status}")
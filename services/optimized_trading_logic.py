@@ -15,19 +15,42 @@ Exit conditions (managed by bot):
 """
 
 import logging
+import math
+from typing import NamedTuple, Optional
+
 import numpy as np
 import pandas as pd
 
+from services._trading_njit import (
+    NUMBA_AVAILABLE, SIGNAL_BUY, SIGNAL_NAN, SIGNAL_NONE, SIGNAL_SELL, SIGNAL_WEAK_TREND, decide, decide_batch,
+    true_range,
+)
+
 logger = logging.getLogger(__name__)
 
 
+class TradeDecision(NamedTuple):
+    """should_trade result; unpacks like the original 6-tuple"""
+    should_trade: bool
+    trade_type: Optional[str]
+    reason: str
+    confidence: float
+    stop_loss: Optional[float]
+    take_profit: Optional[float]
+
+
+# Fixed no-trade results, shared instead of rebuilt on every tick
+_NO_TRADE_INSUFFICIENT_DATA = TradeDecision(False, None, "Insufficient data", 0.0, None, None)
+_NO_TRADE_INDICATOR_NAN = TradeDecision(False, None, "Indicator NaN", 0.0, None, None)
+_NO_TRADE_NOT_ALIGNED = TradeDecision(False, None, "EMA/MACD not aligned", 0.0, None, None)
+
+
 class OptimizedTradingLogic:
+    __slots__ = ()  # stateless: indicators come from historical_df, reentry state lives in the bot
+
     ADX_PERIOD = 14
     ADX_THRESHOLD = 25.0
 
-    def __init__(self):
-        pass
-
     @staticmethod
     def _wilder_smooth(series: pd.Series, period: int) -> pd.Series:
         return series.ewm(alpha=1.0 / period, adjust=False).mean()
@@ -44,12 +67,18 @@ class OptimizedTradingLogic:
         plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0.0), index=df.index)
         minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0.0), index=df.index)
 
-        prev_close = close.shift(1)
-        tr = pd.concat([
-            high - low,
-            (high - prev_close).abs(),
-            (low - prev_close).abs(),
-        ], axis=1).max(axis=1)
+        # True range on plain arrays (fmax skips the NaN previous close of the first bar)
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE:
+            tr = true_range(h, l, c)  # fused single pass, no temporaries
+        else:
+            prev_close = np.empty(len(c))
+            prev_close[:1] = np.nan
+            prev_close[1:] = c[:-1]
+            tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        tr = pd.Series(tr, index=df.index)
 
         atr = cls._wilder_smooth(tr, period)
         plus_di = 100.0 * cls._wilder_smooth(plus_dm, period) / atr.replace(0, np.nan)
@@ -60,6 +89,30 @@ class OptimizedTradingLogic:
 
         return pd.DataFrame({'adx': adx, 'plus_di': plus_di, 'minus_di': minus_di}, index=df.index)
 
+    @classmethod
+    def scan_signals(cls, historical_df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized decide() over every bar, for backtests.
+        Row i holds the (status, confidence) should_trade reports when row i is the confirmed bar."""
+        adx = cls.calculate_adx(historical_df, period=cls.ADX_PERIOD)['adx'].to_numpy(dtype=np.float64)
+        ema20 = historical_df['ema_20'].to_numpy(dtype=np.float64)
+        ema50 = historical_df['ema_50'].to_numpy(dtype=np.float64)
+        macd_hist = historical_df['macd_histogram'].to_numpy(dtype=np.float64)
+
+        if NUMBA_AVAILABLE:
+            # same kernel as should_trade, run over every bar in one compiled loop
+            status, confidence = decide_batch(adx, ema20, ema50, macd_hist, cls.ADX_THRESHOLD)
+        else:
+            is_nan = np.isnan(adx) | np.isnan(ema20) | np.isnan(ema50) | np.isnan(macd_hist)
+            buy = (ema20 > ema50) & (macd_hist > 0)
+            sell = (ema20 < ema50) & (macd_hist < 0)
+            status = np.select(
+                [is_nan, adx < cls.ADX_THRESHOLD, buy, sell],
+                [SIGNAL_NAN, SIGNAL_WEAK_TREND, SIGNAL_BUY, SIGNAL_SELL],
+                SIGNAL_NONE,
+            )
+            confidence = np.where((status == SIGNAL_BUY) | (status == SIGNAL_SELL), np.minimum(adx / 50.0, 1.0), 0.0)
+        return pd.DataFrame({'status': status, 'confidence': confidence}, index=historical_df.index)
+
     def get_indicator_snapshot(self, historical_df):
         """Return ADX/EMA20/EMA50/MACD_hist at confirmed bar (iloc[-2]) for logging.
         Returns dict with float values, or None for any indicator that can't be read."""
@@ -82,44 +135,51 @@ class OptimizedTradingLogic:
                 pass
         return snap
 
-    def should_trade(self, market_data, historical_df=None, **_kwargs):
+    def should_trade(self, market_data, historical_df=None, adx=None, **_kwargs):
         """
-        Returns: (should_trade, trade_type, reason, confidence, stop_loss, take_profit)
+        Returns: TradeDecision(should_trade, trade_type, reason, confidence, stop_loss, take_profit)
         stop_loss / take_profit are None — bot applies fixed -1% / +2%.
+        adx: confirmed-bar ADX already computed for this historical_df (e.g. get_indicator_snapshot's);
+        None recomputes it.
         """
         if historical_df is None or len(historical_df) < 60:
-            return False, None, "Insufficient data", 0.0, None, None
+            return _NO_TRADE_INSUFFICIENT_DATA
 
         required_cols = {'high', 'low', 'close', 'ema_20', 'ema_50', 'macd_histogram'}
         if not required_cols.issubset(historical_df.columns):
             missing = required_cols - set(historical_df.columns)
-            return False, None, f"Missing columns: {missing}", 0.0, None, None
+            return TradeDecision(False, None, f"Missing columns: {missing}", 0.0, None, None)
 
         try:
-            adx_df = self.calculate_adx(historical_df, period=self.ADX_PERIOD)
-            adx = float(adx_df['adx'].iloc[-2])
             ema20 = float(historical_df['ema_20'].iloc[-2])
             ema50 = float(historical_df['ema_50'].iloc[-2])
             macd_hist = float(historical_df['macd_histogram'].iloc[-2])
+            # a NaN here decides "Indicator NaN" whatever ADX is, so skip the ADX pass
+            if math.isnan(ema20) or math.isnan(ema50) or math.isnan(macd_hist):
+                return _NO_TRADE_INDICATOR_NAN
+            if adx is None:
+                adx_df = self.calculate_adx(historical_df, period=self.ADX_PERIOD)
+                adx = float(adx_df['adx'].iloc[-2])
         except (IndexError, ValueError, TypeError) as e:
-            return False, None, f"Indicator read error: {e}", 0.0, None, None
+            return TradeDecision(False, None, f"Indicator read error: {e}", 0.0, None, None)
+
+        status, confidence = decide(adx, ema20, ema50, macd_hist, self.ADX_THRESHOLD)
 
-        if pd.isna(adx) or pd.isna(ema20) or pd.isna(ema50) or pd.isna(macd_hist):
-            return False, None, "Indicator NaN", 0.0, None, None
+        if status == SIGNAL_NAN:
+            return _NO_TRADE_INDICATOR_NAN
 
-        logger.info(f"[v4] ADX={adx:.2f} EMA20={ema20:.4f} EMA50={ema50:.4f} MACD_hist={macd_hist:.5f}")
+        # per-tick snapshot: lazy %-formatting so it costs nothing unless DEBUG is on
+        logger.debug("[v4] ADX=%.2f EMA20=%.4f EMA50=%.4f MACD_hist=%.5f", adx, ema20, ema50, macd_hist)
 
-        if adx < self.ADX_THRESHOLD:
-            return False, None, f"Weak trend (ADX={adx:.2f} < {self.ADX_THRESHOLD})", 0.0, None, None
+        if status == SIGNAL_WEAK_TREND:
+            return TradeDecision(False, None, f"Weak trend (ADX={adx:.2f} < {self.ADX_THRESHOLD})", 0.0, None, None)
 
-        if ema20 > ema50 and macd_hist > 0:
-            confidence = min(adx / 50.0, 1.0)
+        if status == SIGNAL_BUY:
             reason = f"Uptrend: ADX={adx:.1f}, EMA20>EMA50, MACD_hist>0"
-            return True, 'BUY', reason, confidence, None, None
+            return TradeDecision(True, 'BUY', reason, confidence, None, None)
 
-        if ema20 < ema50 and macd_hist < 0:
-            confidence = min(adx / 50.0, 1.0)
+        if status == SIGNAL_SELL:
             reason = f"Downtrend: ADX={adx:.1f}, EMA20<EMA50, MACD_hist<0"
-            return True, 'SELL', reason, confidence, None, None
+            return TradeDecision(True, 'SELL', reason, confidence, None, None)
 
-        return False, None, "EMA/MACD not aligned", 0.0, None, None
+        return _NO_TRADE_NOT_ALIGNED
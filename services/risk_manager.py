@@ -24,6 +24,18 @@ class RiskManager:
         self.trailing_stop_enabled = True
         self.trailing_start_profit = 0.015  # Start trailing at 1.5% profit (早期化: 2% → 1.5%)
         self.trailing_distance = 0.01      # 1% trailing distance
+    
+    @property
+    def trailing_distance(self):
+        """Trailing distance as a ratio of the current price"""
+        return self._trailing_distance
+    
+    @trailing_distance.setter
+    def trailing_distance(self, value):
+        self._trailing_distance = value
+        # Trailing stop price multipliers (BUY trails below the price, SELL above), kept in sync here
+        self._buy_trailing_mult = 1 - value
+        self._sell_trailing_mult = 1 + value
         
     def update_settings(self, settings):
         """Update risk settings from user settings"""
@@ -140,7 +152,7 @@ class RiskManager:
 
                 # Update trailing stop if profitable
                 if self.trailing_stop_enabled and profit_loss_ratio >= self.trailing_start_profit:
-                    new_trailing_stop = current_price * (1 - self.trailing_distance)
+                    new_trailing_stop = current_price * self._buy_trailing_mult
                     if not hasattr(trade, 'trailing_stop_price') or new_trailing_stop > trade.trailing_stop_price:
                         trade.trailing_stop_price = new_trailing_stop
                         logger.info(f"Updated trailing stop for trade {trade.id}: {new_trailing_stop:.4f}")
@@ -170,7 +182,7 @@ class RiskManager:
 
                 # Update trailing stop if profitable
                 if self.trailing_stop_enabled and profit_loss_ratio >= self.trailing_start_profit:
-                    new_trailing_stop = current_price * (1 + self.trailing_distance)
+                    new_trailing_stop = current_price * self._sell_trailing_mult
                     if not hasattr(trade, 'trailing_stop_price') or new_trailing_stop < trade.trailing_stop_price:
                         trade.trailing_stop_price = new_trailing_stop
                         logger.info(f"Updated trailing stop for trade {trade.id}: {new_trailing_stop:.4f}")
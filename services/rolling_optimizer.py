@@ -9,12 +9,17 @@
 - 追加コストゼロ（既存データ + CPU演算のみ）
 """
 
+import atexit
 import logging
+import time
 import numpy as np
 import pandas as pd
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from itertools import product
 
+from services._rolling_njit import NUMBA_AVAILABLE, simulate_macd_trades
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,9 +33,13 @@ class RollingOptimizer:
 
     def __init__(self):
         self.last_optimization_time = None
+        self._last_optimization_mono = None  # 間隔判定用（monotonic、時刻変更の影響なし）
         self.optimization_interval = 900  # 15分ごとに最適化
         self.current_best_params = None
-        self.optimization_history = []  # 直近の最適化結果を保持
+        self.optimization_history = deque(maxlen=10)  # 直近の最適化結果を保持（最大10件）
+        self.execution_log_file = 'bot_execution_log.txt'
+        self._execution_log = None  # 行バッファの追記ハンドル（初回書き込み時に開く）
+        atexit.register(self.close)
 
         # パラメータ探索空間
         # DOGE/JPYの15分足ではMACDヒストグラムが非常に小さい（0.001〜0.01程度）
@@ -123,10 +132,9 @@ class RollingOptimizer:
 
     def should_optimize(self):
         """最適化を実行すべきか判定"""
-        if self.last_optimization_time is None:
+        if self._last_optimization_mono is None:
             return True
-        elapsed = (datetime.now(timezone.utc) - self.last_optimization_time).total_seconds()
-        return elapsed >= self.optimization_interval
+        return time.monotonic() - self._last_optimization_mono >= self.optimization_interval
 
     def optimize(self, df):
         """
@@ -143,7 +151,7 @@ class RollingOptimizer:
             return self.current_best_params
 
         logger.info("🧠 === Rolling Optimization Start ===")
-        start_time = datetime.now()
+        start_time = time.monotonic()
 
         best_params = None
         best_pnl = float('-inf')
@@ -159,6 +167,13 @@ class RollingOptimizer:
             total_combos *= len(v)
         logger.info(f"   Testing {total_combos} parameter combinations...")
 
+        # MACDはプリセットごとに1回だけ計算（組み合わせ間で共有）
+        closes = df['close'].values
+        macd_cache = {
+            name: self._calculate_macd(closes, macd['fast'], macd['slow'], macd['signal'])
+            for name, macd in self.macd_presets.items()
+        }
+
         for combo in product(*grid_values):
             params = dict(zip(grid_keys, combo))
 
@@ -172,7 +187,7 @@ class RollingOptimizer:
             params['trailing_stops'] = self.trailing_templates[params['breakeven_threshold']]
 
             # シミュレーション実行
-            stats = self._simulate_trades(df.copy(), params)
+            stats = self._simulate_trades(df.copy(), params, macd=macd_cache[params['macd_preset']])
 
             if stats is not None:
                 results.append((params.copy(), stats))
@@ -189,20 +204,19 @@ class RollingOptimizer:
                     best_params = params.copy()
                     best_stats = stats
 
-        elapsed = (datetime.now() - start_time).total_seconds()
+        self._last_optimization_mono = time.monotonic()
+        elapsed = self._last_optimization_mono - start_time
         self.last_optimization_time = datetime.now(timezone.utc)
 
         if best_params and best_stats:
             self.current_best_params = best_params
 
-            # 履歴に保存（最大10件）
+            # 履歴に保存（最大10件、古いものはdequeが自動で破棄）
             self.optimization_history.append({
                 'time': datetime.now(timezone.utc).isoformat(),
                 'params': best_params,
                 'stats': best_stats,
             })
-            if len(self.optimization_history) > 10:
-                self.optimization_history.pop(0)
 
             logger.info(f"🧠 === Optimization Complete ({elapsed:.1f}s) ===")
             logger.info(f"   Best params:")
@@ -220,22 +234,47 @@ class RollingOptimizer:
                 logger.info(f"     Avg win: ¥{best_stats['avg_win']:.1f}, Avg loss: ¥{best_stats['avg_loss']:.1f}")
 
             # ログファイルにも記録
-            try:
-                with open('bot_execution_log.txt', 'a') as f:
-                    f.write(f"OPTIMIZATION: SL={best_params['stop_loss_pct']*100:.1f}% "
-                            f"BE={best_params['breakeven_threshold']*100:.1f}% "
-                            f"MACD={best_params['macd_preset']} "
-                            f"PnL=¥{best_stats['net_pnl']:.1f} "
-                            f"Trades={best_stats['total_trades']} "
-                            f"WR={best_stats['wins']}/{best_stats['total_trades']}\n")
-            except:
-                pass
+            self._append_execution_log(f"OPTIMIZATION: SL={best_params['stop_loss_pct']*100:.1f}% "
+                                       f"BE={best_params['breakeven_threshold']*100:.1f}% "
+                                       f"MACD={best_params['macd_preset']} "
+                                       f"PnL=¥{best_stats['net_pnl']:.1f} "
+                                       f"Trades={best_stats['total_trades']} "
+                                       f"WR={best_stats['wins']}/{best_stats['total_trades']}")
         else:
             logger.info(f"🧠 Optimization: no profitable parameters found, keeping current")
 
         return self.current_best_params
 
-    def _simulate_trades(self, df, params):
+    def _append_execution_log(self, line):
+        """bot_execution_log.txt に1行追記（ハンドルは開いたまま再利用、行バッファで即時反映）"""
+        try:
+            if self._execution_log is None:
+                self._execution_log = open(self.execution_log_file, 'a', buffering=1, encoding='utf-8')
+            self._execution_log.write(line + '\n')
+        except OSError as e:
+            logger.warning(f"Execution log write failed: {e}")
+            self.close()
+
+    def close(self):
+        """実行ログのハンドルを閉じる（次の書き込みで開き直す。終了時にatexitから呼ばれる）"""
+        if self._execution_log is not None:
+            try:
+                self._execution_log.close()
+            except OSError as e:
+                logger.warning(f"Execution log close failed: {e}")
+            self._execution_log = None
+
+    @staticmethod
+    def _calculate_macd(closes, fast, slow, signal):
+        """MACDライン・シグナルラインを計算（EMAは adjust=False の再帰形）"""
+        close_series = pd.Series(closes)
+        ema_fast = close_series.ewm(span=fast, adjust=False).mean()
+        ema_slow = close_series.ewm(span=slow, adjust=False).mean()
+        macd_line = (ema_fast - ema_slow).values
+        signal_line = pd.Series(macd_line).ewm(span=signal, adjust=False).mean().values
+        return macd_line, signal_line
+
+    def _simulate_trades(self, df, params, macd=None):
         """
         パラメータセットでの取引をシミュレーション
 
@@ -243,144 +282,51 @@ class RollingOptimizer:
         トレーリングストップ、ハードSL、MACDクロス決済を含む完全な
         取引サイクルを再現する。
 
+        Args:
+            macd: 計算済みの (macd_line, signal_line)。省略時はparamsから計算
+
         Returns:
             dict: 取引統計 or None
         """
         try:
-            closes = df['close'].values
-            highs = df['high'].values
-            lows = df['low'].values
+            closes = df['close'].to_numpy(dtype=np.float64)
+            highs = df['high'].to_numpy(dtype=np.float64)
+            lows = df['low'].to_numpy(dtype=np.float64)
 
             # MACDを指定パラメータで計算
-            close_series = pd.Series(closes)
-            ema_fast = close_series.ewm(span=params['macd_fast'], adjust=False).mean()
-            ema_slow = close_series.ewm(span=params['macd_slow'], adjust=False).mean()
-            macd_line = (ema_fast - ema_slow).values
-            signal_line = pd.Series(macd_line).ewm(span=params['macd_signal'], adjust=False).mean().values
-            histogram = macd_line - signal_line
-
-            stop_loss_pct = params['stop_loss_pct']
-            entry_hist_filter = params['entry_hist_filter']
-            close_hist_filter = params['close_hist_filter']
+            if macd is None:
+                macd = self._calculate_macd(closes, params['macd_fast'], params['macd_slow'], params['macd_signal'])
+            macd_line, signal_line = macd
+
+            # 確定済みローソク足ベースのクロス（バー i は i-1 と i-2 のMACD位置を比較）
+            # 位置は +1 (above) / -1 (below) の整数: 差が +2 ならゴールデン、-2 ならデッド
+            macd_pos = np.where(macd_line > signal_line, 1, -1)
+            cross = np.zeros(len(closes), dtype=np.int64)
+            cross[2:] = macd_pos[1:-1] - macd_pos[:-2]
+            confirmed_hists = np.empty(len(closes))
+            confirmed_hists[:1] = np.nan
+            confirmed_hists[1:] = np.abs(macd_line[:-1] - signal_line[:-1])
+
             trailing_stops = params['trailing_stops']
+            trailing_thresholds = np.array([threshold for threshold, _ in trailing_stops], dtype=np.float64)
+            trailing_locks = np.array([lock for _, lock in trailing_stops], dtype=np.float64)
 
-            # シミュレーション状態
-            position = None  # {'side': 'BUY'/'SELL', 'entry_price': float, 'size': 50}
-            last_macd_pos = None
-            trades = []
-            fee_per_trade = 1.0  # ¥1/取引
+            series = (closes, highs, lows, cross, confirmed_hists)
+            if not NUMBA_AVAILABLE:
+                series = tuple(a.tolist() for a in series)  # plain lists index faster in pure Python
 
             # 最低30本のウォームアップ（MACD安定化）
             start_idx = max(params['macd_slow'] + params['macd_signal'], 30)
 
-            for i in range(start_idx, len(closes)):
-                price = closes[i]
-                high = highs[i]
-                low = lows[i]
-                ml = macd_line[i]
-                ms = signal_line[i]
-                hist = abs(ml - ms)
-
-                # 確定済みローソク足のMACD位置（1本前）
-                if i < 2:
-                    continue
-                confirmed_ml = macd_line[i - 1]
-                confirmed_ms = signal_line[i - 1]
-                confirmed_pos = 'above' if confirmed_ml > confirmed_ms else 'below'
-                confirmed_hist = abs(confirmed_ml - confirmed_ms)
-
-                prev_ml = macd_line[i - 2]
-                prev_ms = signal_line[i - 2]
-                prev_pos = 'above' if prev_ml > prev_ms else 'below'
-
-                # MACDクロス検出（確定済みベース）
-                is_golden = (prev_pos == 'below' and confirmed_pos == 'above')
-                is_death = (prev_pos == 'above' and confirmed_pos == 'below')
-
-                # === ポジション保有中: 決済判定 ===
-                if position is not None:
-                    side = position['side']
-                    entry = position['entry_price']
-                    size = position['size']
-
-                    if side == 'BUY':
-                        pl_ratio = (price - entry) / entry
-                        # ローソク足内の最安値でSLチェック
-                        worst_pl = (low - entry) / entry
-                    else:
-                        pl_ratio = (entry - price) / entry
-                        worst_pl = (entry - high) / entry
-
-                    # トレーリングストップ更新
-                    peak_pl = position.get('peak_pl', 0.0)
-                    if pl_ratio > peak_pl:
-                        position['peak_pl'] = pl_ratio
-                        peak_pl = pl_ratio
-
-                    current_sl = -stop_loss_pct  # デフォルトはハードSL
-                    for threshold, lock in trailing_stops:
-                        if peak_pl >= threshold:
-                            current_sl = lock
-
-                    # SLチェック（ローソク足内の最悪値で判定）
-                    if worst_pl <= current_sl:
-                        # 実際の決済価格をSLレベルで推定
-                        if current_sl >= 0:
-                            exit_price = entry * (1 + current_sl) if side == 'BUY' else entry * (1 - current_sl)
-                        else:
-                            exit_price = entry * (1 + current_sl) if side == 'BUY' else entry * (1 - current_sl)
-
-                        pnl = (exit_price - entry) * size if side == 'BUY' else (entry - exit_price) * size
-                        trades.append({
-                            'pnl': pnl,
-                            'fees': fee_per_trade * 2,  # エントリー+決済
-                            'reason': 'trailing_stop' if current_sl >= 0 else 'hard_sl',
-                        })
-                        position = None
-                        continue
-
-                    # MACDクロス決済
-                    if side == 'BUY' and is_death and confirmed_hist > close_hist_filter:
-                        pnl = (price - entry) * size
-                        trades.append({
-                            'pnl': pnl,
-                            'fees': fee_per_trade * 2,
-                            'reason': 'macd_cross',
-                        })
-                        position = None
-                        # フォールスルーして反対エントリー判定へ
-
-                    elif side == 'SELL' and is_golden and confirmed_hist > close_hist_filter:
-                        pnl = (entry - price) * size
-                        trades.append({
-                            'pnl': pnl,
-                            'fees': fee_per_trade * 2,
-                            'reason': 'macd_cross',
-                        })
-                        position = None
-                        # フォールスルーして反対エントリー判定へ
-
-                # === ポジションなし: エントリー判定 ===
-                if position is None:
-                    if is_golden and confirmed_hist > entry_hist_filter:
-                        position = {
-                            'side': 'BUY',
-                            'entry_price': price,
-                            'size': 50,  # 固定サイズ（手数料比較のため統一）
-                            'peak_pl': 0.0,
-                        }
-                    elif is_death and confirmed_hist > entry_hist_filter:
-                        position = {
-                            'side': 'SELL',
-                            'entry_price': price,
-                            'size': 50,
-                            'peak_pl': 0.0,
-                        }
-
-            # 未決済ポジションは含み損益を計算（ただし統計には含めない）
-            # 確定した取引のみで評価
-
-            if len(trades) == 0:
+            # 確定した取引のみで評価（未決済ポジションは統計に含めない）
+            total_trades, gross_pnl, total_fees, wins, win_pnl, loss_pnl = simulate_macd_trades(
+                *series, start_idx,
+                params['stop_loss_pct'], params['entry_hist_filter'], params['close_hist_filter'],
+                trailing_thresholds, trailing_locks,
+                1.0,  # ¥1/取引
+            )
+
+            if total_trades == 0:
                 return {
                     'net_pnl': 0,
                     'gross_pnl': 0,
@@ -392,23 +338,16 @@ class RollingOptimizer:
                     'avg_loss': 0,
                 }
 
-            # 統計計算
-            gross_pnl = sum(t['pnl'] for t in trades)
-            total_fees = sum(t['fees'] for t in trades)
-            net_pnl = gross_pnl - total_fees
-
-            wins = [t for t in trades if t['pnl'] > 0]
-            losses = [t for t in trades if t['pnl'] <= 0]
-
+            losses = total_trades - wins
             return {
-                'net_pnl': net_pnl,
+                'net_pnl': gross_pnl - total_fees,
                 'gross_pnl': gross_pnl,
                 'total_fees': total_fees,
-                'total_trades': len(trades),
-                'wins': len(wins),
-                'losses': len(losses),
-                'avg_win': np.mean([t['pnl'] for t in wins]) if wins else 0,
-                'avg_loss': np.mean([t['pnl'] for t in losses]) if losses else 0,
+                'total_trades': total_trades,
+                'wins': wins,
+                'losses': losses,
+                'avg_win': win_pnl / wins if wins else 0,
+                'avg_loss': loss_pnl / losses if losses else 0,
             }
 
         except Exception as e:
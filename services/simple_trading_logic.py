@@ -1,4 +1,5 @@
 import logging
+import time
 from datetime import datetime
 import pandas as pd
 
@@ -11,6 +12,7 @@ class SimpleTradingLogic:
     
     def __init__(self):
         self.last_trade_time = None
+        self._last_trade_mono = None  # monotonic clock for interval math (immune to clock changes)
         self.min_trade_interval = 0  # No cooldown - allow immediate trading
         
     def should_trade(self, market_data):
@@ -21,14 +23,16 @@ class SimpleTradingLogic:
         :return: tuple (should_trade, trade_type, reason, confidence)
         """
         try:
-            # Current price and indicators
-            current_price = market_data.get('close', 0)
-            rsi = market_data.get('rsi_14', 50)
-            macd_line = market_data.get('macd_line', 0)
-            macd_signal = market_data.get('macd_signal', 0)
-            bb_upper = market_data.get('bb_upper', current_price * 1.02)
-            bb_lower = market_data.get('bb_lower', current_price * 0.98)
-            bb_middle = market_data.get('bb_middle', current_price)
+            # Current price and indicators (each key is read once)
+            md_get = market_data.get
+            current_price = md_get('close', 0)
+            rsi = md_get('rsi_14', 50)
+            macd_line = md_get('macd_line', 0)
+            macd_signal = md_get('macd_signal', 0)
+            macd_histogram = md_get('macd_histogram', macd_line - macd_signal)
+            bb_upper = md_get('bb_upper', current_price * 1.02)
+            bb_lower = md_get('bb_lower', current_price * 0.98)
+            ema_20 = md_get('ema_20', current_price)
             
             # Calculate signals
             signals = []
@@ -47,49 +51,42 @@ class SimpleTradingLogic:
                 rsi_oversold = 28  # More conservative than 33
                 rsi_overbought = 72  # More conservative than 67
 
-            # Check for trend confirmation to avoid false signals
-            current_price = market_data.get('close', 0)
-            ema_20 = market_data.get('ema_20', current_price)
-
             # RSI signals with trend confirmation
             if rsi < rsi_oversold and current_price > ema_20 * 0.995:  # Price above EMA for uptrend
                 signal_strength = 0.8 + (rsi_oversold - rsi) / 100
                 signals.append(('BUY', 'RSI Oversold + Uptrend', min(signal_strength, 1.0)))
-                logger.info(f"RSI Buy Signal: {rsi:.2f} < {rsi_oversold} with trend confirmation")
+                logger.info("RSI Buy Signal: %.2f < %s with trend confirmation", rsi, rsi_oversold)
             elif rsi > rsi_overbought and current_price < ema_20 * 1.005:  # Price below EMA for downtrend
                 signal_strength = 0.8 + (rsi - rsi_overbought) / 100
                 signals.append(('SELL', 'RSI Overbought + Downtrend', min(signal_strength, 1.0)))
-                logger.info(f"RSI Sell Signal: {rsi:.2f} > {rsi_overbought} with trend confirmation")
+                logger.info("RSI Sell Signal: %.2f > %s with trend confirmation", rsi, rsi_overbought)
             
             # 2. MACD Signals (Medium weight) - Fixed crossover logic
-            macd_histogram = market_data.get('macd_histogram', macd_line - macd_signal)
-
             # MACD crossover signals - focus on momentum changes
             if macd_line > macd_signal:
                 # Bullish crossover - but verify momentum is increasing
                 if macd_histogram > 0.002:  # Minimum momentum threshold
                     signals.append(('BUY', 'MACD Bullish Crossover', 0.6))
-                    logger.info(f"MACD Buy Signal: Line {macd_line:.4f} > Signal {macd_signal:.4f}, momentum {macd_histogram:.4f}")
+                    logger.info("MACD Buy Signal: Line %.4f > Signal %.4f, momentum %.4f", macd_line, macd_signal, macd_histogram)
             elif macd_line < macd_signal:
                 # Bearish crossover - verify momentum is decreasing
                 if macd_histogram < -0.002:  # Minimum momentum threshold
                     signals.append(('SELL', 'MACD Bearish Crossover', 0.6))
-                    logger.info(f"MACD Sell Signal: Line {macd_line:.4f} < Signal {macd_signal:.4f}, momentum {macd_histogram:.4f}")
+                    logger.info("MACD Sell Signal: Line %.4f < Signal %.4f, momentum %.4f", macd_line, macd_signal, macd_histogram)
                 else:
                     # Weak bearish signal - reduce weight
                     signals.append(('SELL', 'MACD Weak Bearish', 0.3))
-                    logger.info(f"MACD Weak Sell: Line {macd_line:.4f} < Signal {macd_signal:.4f}, weak momentum {macd_histogram:.4f}")
+                    logger.info("MACD Weak Sell: Line %.4f < Signal %.4f, weak momentum %.4f", macd_line, macd_signal, macd_histogram)
             
             # 3. Bollinger Band Signals (Medium weight)
             if current_price < bb_lower * 1.005:  # Near lower band
                 signals.append(('BUY', 'BB Bounce', 0.7))
-                logger.info(f"BB Buy Signal: Price {current_price} near lower band {bb_lower}")
+                logger.info("BB Buy Signal: Price %s near lower band %s", current_price, bb_lower)
             elif current_price > bb_upper * 0.995:  # Near upper band
                 signals.append(('SELL', 'BB Reversal', 0.7))
-                logger.info(f"BB Sell Signal: Price {current_price} near upper band {bb_upper}")
+                logger.info("BB Sell Signal: Price %s near upper band %s", current_price, bb_upper)
             
             # 4. Moving Average Signal - Changed to EMA for better responsiveness
-            ema_20 = market_data.get('ema_20', current_price)
             if current_price > ema_20 * 1.01:
                 signals.append(('BUY', 'Above EMA', 0.5))
             elif current_price < ema_20 * 0.99:
@@ -102,9 +99,11 @@ class SimpleTradingLogic:
             buy_strength = sum([s[2] for s in buy_signals])
             sell_strength = sum([s[2] for s in sell_signals])
             
-            logger.info(f"Signal Analysis - Buy strength: {buy_strength:.2f}, Sell strength: {sell_strength:.2f}")
-            logger.info(f"Buy signals: {[f'{s[1]}({s[2]})' for s in buy_signals]}")
-            logger.info(f"Sell signals: {[f'{s[1]}({s[2]})' for s in sell_signals]}")
+            # Signal lists are only rendered when INFO output is actually enabled
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Signal Analysis - Buy strength: %.2f, Sell strength: %.2f", buy_strength, sell_strength)
+                logger.info("Buy signals: %s", [f'{s[1]}({s[2]})' for s in buy_signals])
+                logger.info("Sell signals: %s", [f'{s[1]}({s[2]})' for s in sell_signals])
             
             # Dynamic decision threshold based on market volatility
             if volatility_score > 0.7:  # High volatility - require stronger signals
@@ -123,7 +122,8 @@ class SimpleTradingLogic:
                 return True, 'SELL', f"Sell signals: {', '.join(reasons)}", sell_strength
             
             # No strong signal
-            logger.info(f"No strong trading signal. Buy: {buy_strength:.2f}, Sell: {sell_strength:.2f}, Min required: {min_signal_strength}")
+            logger.info("No strong trading signal. Buy: %.2f, Sell: %.2f, Min required: %s",
+                        buy_strength, sell_strength, min_signal_strength)
             return False, None, "No clear signal", max(buy_strength, sell_strength)
             
         except Exception as e:
@@ -132,15 +132,15 @@ class SimpleTradingLogic:
     
     def check_trade_timing(self):
         """Check if enough time has passed since last trade"""
-        if not self.last_trade_time:
+        if self._last_trade_mono is None:
             return True
         
-        time_since_last = (datetime.now() - self.last_trade_time).total_seconds()
-        return time_since_last >= self.min_trade_interval
+        return time.monotonic() - self._last_trade_mono >= self.min_trade_interval
     
     def record_trade(self):
         """Record the time of the last trade"""
-        self.last_trade_time = datetime.now()
+        self.last_trade_time = datetime.now()  # wall-clock time kept for callers
+        self._last_trade_mono = time.monotonic()
     
     def get_market_summary(self, market_data):
         """Get a summary of current market conditions"""
@@ -177,24 +177,25 @@ class SimpleTradingLogic:
     def _calculate_market_volatility(self, market_data):
         """Calculate market volatility score from 0-1 based on indicators"""
         try:
+            md_get = market_data.get
             volatility_factors = []
 
             # RSI volatility - distance from neutral
-            rsi = market_data.get('rsi_14', 50)
+            rsi = md_get('rsi_14', 50)
             rsi_volatility = abs(rsi - 50) / 50
             volatility_factors.append(min(rsi_volatility, 1))
 
             # Bollinger Band width
-            bb_upper = market_data.get('bb_upper', 0)
-            bb_lower = market_data.get('bb_lower', 0)
-            close = market_data.get('close', 0)
+            bb_upper = md_get('bb_upper', 0)
+            bb_lower = md_get('bb_lower', 0)
+            close = md_get('close', 0)
             if bb_upper > 0 and bb_lower > 0 and close > 0:
                 bb_width = (bb_upper - bb_lower) / close
                 bb_volatility = min(bb_width * 50, 1)
                 volatility_factors.append(bb_volatility)
 
             # MACD momentum
-            macd_histogram = market_data.get('macd_histogram', 0)
+            macd_histogram = md_get('macd_histogram', 0)
             macd_volatility = min(abs(macd_histogram) * 10, 1)
             volatility_factors.append(macd_volatility)
 
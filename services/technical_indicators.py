@@ -74,11 +74,14 @@ class TechnicalIndicators:
     @staticmethod
     def calculate_atr(high, low, close, timeperiod=14):
         """Average True Range using pandas/numpy"""
-        high_low = high - low
-        high_close = abs(high - close.shift())
-        low_close = abs(low - close.shift())
-
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+        # True range on plain arrays (fmax skips NaN like DataFrame.max, e.g. the first bar's missing previous close)
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        prev_close = np.empty(len(c))
+        prev_close[:1] = np.nan
+        prev_close[1:] = c[:-1]
+        true_range = pd.Series(np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close))), index=high.index)
         atr = true_range.rolling(window=timeperiod).mean()
         return atr
 
@@ -88,16 +91,21 @@ class TechnicalIndicators:
         if len(df) < 50:
             return 'ranging'
 
-        # ATR-based volatility
-        atr = TechnicalIndicators.calculate_atr(df['high'], df['low'], df['close'], timeperiod=14)
-        atr_pct = (atr / df['close']) * 100
+        # ATR-based volatility (only the latest value is needed: mean TR of the last 14 bars)
+        atr_period = 14
+        h = df['high'].to_numpy(dtype=np.float64)[-atr_period:]
+        l = df['low'].to_numpy(dtype=np.float64)[-atr_period:]
+        c = df['close'].to_numpy(dtype=np.float64)[-atr_period - 1:]
+        prev_close = c[:-1]
+        true_range = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        atr_pct = true_range.mean() / c[-1] * 100
 
         # Trend strength using ADX concept
         high_low_range = df['high'].rolling(20).max() - df['low'].rolling(20).min()
         close_range = df['close'].iloc[-1] - df['close'].iloc[-20] if len(df) >= 20 else 0
         trend_strength = abs(close_range) / high_low_range.iloc[-1] if high_low_range.iloc[-1] > 0 else 0
 
-        volatility_score = atr_pct.iloc[-1]
+        volatility_score = atr_pct
 
         if volatility_score > 3.0:
             return 'volatile'